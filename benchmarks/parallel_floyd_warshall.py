@@ -0,0 +1,83 @@
+"""
+Speedup of ParallelFloydWarshallProfile over 1/2/4/8 workers
+
+Usage:
+    $ python3 benchmarks/parallel_floyd_warshall.py --n 120 --workers 1 2 4 8
+
+Prints one JSON object per run (wall time and speedup against the
+single-process FloydWarshallProfile.run_vectorized)
+"""
+import argparse
+import json
+import random
+import time
+from copy import deepcopy
+
+from ev_routing.parallel_floyd_warshall_profile import ParallelFloydWarshallProfile
+from ev_routing.helper import break_point
+
+AREA = [52.514e0, 13.385e0, 52.516e0, 13.387e0]
+
+
+def random_matrix(n, M, density, seed):
+    """
+    Initial Floyd-Warshall matrix of a random graph with costs in [-M/3, M/2]
+    """
+    rnd = random.Random(seed)
+    matrix = []
+
+    for i in range(n):
+        row = []
+        for j in range(n):
+            if i == j:
+                row.append([break_point.new(0, 0, 1), break_point.new(M, M, 0)])
+            elif rnd.random() < density:
+                row.append(break_point.init({'cost': rnd.uniform(-M / 3, M / 2)}, M))
+            else:
+                row.append([
+                    break_point.new(0, float('-inf'), 0),
+                    break_point.new(M, float('-inf'), 0),
+                ])
+        matrix.append(row)
+
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--n', type=int, default=120)
+    parser.add_argument('--M', type=float, default=100)
+    parser.add_argument('--density', type=float, default=0.03)
+    parser.add_argument('--tile', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    matrix = random_matrix(args.n, args.M, args.density, args.seed)
+
+    fw = ParallelFloydWarshallProfile(AREA, args.M, testing=True, tile=args.tile)
+
+    fw.matrix = deepcopy(matrix)
+    start = time.perf_counter()
+    fw.run_vectorized()
+    serial = time.perf_counter() - start
+    expected = fw.matrix
+
+    print(json.dumps({'engine': 'run_vectorized', 'n': args.n, 'workers': 1, 'time': serial}))
+
+    for workers in args.workers:
+        fw.matrix = deepcopy(matrix)
+        fw.workers = workers
+
+        start = time.perf_counter()
+        fw.run()
+        dt = time.perf_counter() - start
+
+        print(json.dumps({
+            'engine': 'parallel', 'n': args.n, 'workers': workers, 'tile': args.tile,
+            'time': dt, 'speedup': serial / dt, 'equal': fw.matrix == expected,
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Benchmarks of the routing engines and of the break point algebra
+on synthetic grids of increasing size
+
+Usage:
+    $ python3 benchmarks/suite.py --sizes 4 6 8 > baseline.jsonl
+    $ python3 benchmarks/suite.py --sizes 4 6 8 --baseline baseline.jsonl
+
+Prints one JSON object per benchmark and size: wall time (best of
+--repeat runs), peak memory (tracemalloc, in a separate run) and the
+number of calls of the break point primitives. With --baseline, results
+slower or using more peak memory than the baseline by more than
+--tolerance, or calling any primitive more often, are reported on stderr
+and the exit status is 1. Times are only compared if both are at least
+--min-time seconds, shorter ones are mostly noise
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from ev_routing.map import synthetic
+from ev_routing.dijkstra import Dijkstra
+from ev_routing.dijkstra_profile import DijkstraProfile
+from ev_routing.floyd_warshall_profile import FloydWarshallProfile
+from ev_routing.cs_floyd_warshall import CSFloydWarshall
+from ev_routing.helper import break_points_list
+
+# Break point primitives whose calls are counted
+PRIMITIVES = ['link', 'merge', 'sort', '_f']
+
+
+def bench_dijkstra(graph, M, rnd):
+    d = Dijkstra(None, graph=graph)
+    pairs = [(rnd.choice(d.vid), rnd.choice(d.vid)) for _ in range(10)]
+
+    def run():
+        for s, t in pairs:
+            d.dijkstra(s, t, M / 2, M)
+
+    return run
+
+
+def bench_dijkstra_profile(graph, M, rnd):
+    dp = DijkstraProfile(None, M, graph=graph)
+    pairs = [(rnd.choice(dp.vid), rnd.choice(dp.vid)) for _ in range(3)]
+
+    def run():
+        for s, t in pairs:
+            dp.run(s, t)
+
+    return run
+
+
+def bench_floyd_warshall(graph, M, rnd):
+    fw = FloydWarshallProfile(None, M, graph=graph)
+    matrix = [list(row) for row in fw.matrix]
+
+    def run():
+        fw.matrix = [list(row) for row in matrix]
+        fw.run()
+
+    return run
+
+
+def bench_cs_floyd_warshall(graph, M, rnd):
+    n = len(graph[0])
+    stations = rnd.sample(range(n), max(1, n // 10))
+
+    def run():
+        CSFloydWarshall(None, M, graph=graph, station_id=stations)
+
+    return run
+
+
+def bench_break_points(graph, M, rnd):
+    """
+    Primitives on the SoC functions found by a profile search
+    """
+    dp = DijkstraProfile(None, M, graph=graph)
+    f = dp._search(dp.vid[0])
+    functions = [l for l in f.values() if break_points_list.reachable(l)]
+    pairs = [(rnd.choice(functions), rnd.choice(functions)) for _ in range(200)]
+    charges = [rnd.uniform(0, M) for _ in range(20)]
+
+    def run():
+        for l1, l2 in pairs:
+            l = break_points_list.sort(break_points_list.link(l1, l2))
+            break_points_list.merge(l1, l, M)
+
+            for b in charges:
+                break_points_list._f(l, b)
+
+    return run
+
+
+BENCHMARKS = {
+    'dijkstra': (bench_dijkstra, None),
+    'dijkstra_profile': (bench_dijkstra_profile, None),
+    'floyd_warshall': (bench_floyd_warshall, 100),
+    'cs_floyd_warshall': (bench_cs_floyd_warshall, 100),
+    'break_points': (bench_break_points, None),
+}
+
+
+@contextlib.contextmanager
+def counting(module, names):
+    """
+    Counting the calls of module functions while the context is active
+
+    Yields the dictionary of counts
+    """
+    counts = {name: 0 for name in names}
+    originals = {name: getattr(module, name) for name in names}
+
+    def wrap(name):
+        def counted(*args, **kwargs):
+            counts[name] += 1
+            return originals[name](*args, **kwargs)
+        return counted
+
+    for name in names:
+        setattr(module, name, wrap(name))
+
+    try:
+        yield counts
+    finally:
+        for name, f in originals.items():
+            setattr(module, name, f)
+
+
+def measure(name, size, M, repeat, seed):
+    """
+    :return: Result dictionary, None if the graph is too large
+    """
+    bench, max_nodes = BENCHMARKS[name]
+    graph = synthetic.grid(size, size, seed=seed)
+
+    if max_nodes and len(graph[0]) > max_nodes:
+        return None
+
+    run = bench(graph, M, random.Random(seed))
+
+    # Warnings printed by the break point helpers would mix with the
+    # JSON lines on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        with counting(break_points_list, PRIMITIVES) as ops:
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'benchmark': name, 'size': size, 'nodes': len(graph[0]), 'edges': len(graph[1]),
+        'M': M, 'time': min(times), 'peak_memory': peak, 'ops': ops,
+    }
+
+
+def compare(results, baseline, tolerance, min_time):
+    """
+    :return: Pairs (result, reasons) of the results whose time or peak
+        memory exceed their baseline by more than tolerance, or which call
+        a primitive more often (times below min_time are not compared)
+    """
+    base = {(r['benchmark'], r['size']): r for r in baseline}
+    regressions = []
+
+    for r in results:
+        b = base.get((r['benchmark'], r['size']))
+        if b is None:
+            continue
+
+        time_ratio = r['time'] / b['time'] if b['time'] > 0 else 1
+        memory_ratio = r['peak_memory'] / max(b['peak_memory'], 1)
+        more_ops = [name for name, count in r['ops'].items() if count > b['ops'].get(name, 0)]
+
+        print('%-20s %4d  time x%.2f  memory x%.2f  ops %s' % (
+            r['benchmark'], r['size'], time_ratio, memory_ratio,
+            'same' if r['ops'] == b['ops'] else 'changed'), file=sys.stderr)
+
+        reasons = []
+        if min(r['time'], b['time']) >= min_time and time_ratio > 1 + tolerance:
+            reasons.append('time x%.2f' % time_ratio)
+        if memory_ratio > 1 + tolerance:
+            reasons.append('memory x%.2f' % memory_ratio)
+        if more_ops:
+            reasons.append('more calls of %s' % ', '.join(more_ops))
+
+        if reasons:
+            regressions.append((r, reasons))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 6, 8],
+                        help='Sides of the synthetic grids')
+    parser.add_argument('--benchmarks', nargs='+', default=list(BENCHMARKS),
+                        choices=list(BENCHMARKS))
+    parser.add_argument('--M', type=float, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help='JSON lines of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--min-time', type=float, default=0.001,
+                        help='Shortest time (in seconds) which is compared')
+    args = parser.parse_args()
+
+    results = []
+
+    for name in args.benchmarks:
+        for size in args.sizes:
+            result = measure(name, size, args.M, args.repeat, args.seed)
+
+            if result is not None:
+                print(json.dumps(result), flush=True)
+                results.append(result)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = [json.loads(line) for line in handle if line.strip()]
+
+        regressions = compare(results, baseline, args.tolerance, args.min_time)
+
+        for r, reasons in regressions:
+            print('Regression: %s size %d (%s)' % (
+                r['benchmark'], r['size'], ', '.join(reasons)), file=sys.stderr)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
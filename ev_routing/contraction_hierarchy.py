@@ -0,0 +1,370 @@
+import heapq
+import numpy as np
+from .main import EVRouting
+from .helper import break_point
+from .helper import break_points_list
+from .helper import soc_grid
+from .helper.stats import with_stats, primitives, phase
+
+
+class ContractionHierarchy(EVRouting):
+    """Contraction hierarchy with SoC function shortcuts"""
+
+    def __init__(self, area, M, testing=False, hop_limit=4, scc=None, graph=None, profile=None):
+        """
+        Initializing ContractionHierarchy class
+        by calling EVRouting initializer
+
+        Args:
+        area:
+        M: Maximum battery capacity
+        hop_limit: Maximum number of edges of a witness path
+        scc: see EVRouting
+        graph: see EVRouting
+        profile: see EVRouting
+        """
+        EVRouting.__init__(self, area, testing=testing, scc=scc, graph=graph, profile=profile)
+
+        self.M = M
+        self.hop_limit = hop_limit
+
+        self.unreachable = [
+            break_point.new(0, float('-inf'), 0),
+            break_point.new(M, float('-inf'), 0),
+        ]
+
+        # rank[vid]: Position of vid in the contraction order
+        # up[u][w]: Function of the edge u -> w with rank[w] > rank[u]
+        # down[u][w]: Function of the edge u -> w with rank[w] < rank[u]
+        # down_in[w][u]: Same as down[u][w]
+        # middle[(u, w)]: Nodes v of the shortcuts u -> v -> w
+        # The functions of up and down are those of the original edges
+        # merged with the shortcuts, composed when they are added
+        self.rank = {}
+        self.up, self.down, self.down_in = {}, {}, {}
+        self.middle = {}
+        self.n_shortcuts = 0
+
+    def preprocess(self):
+        """
+        Contracting all nodes in the order of their importance
+
+        The importance of a node is its edge difference (shortcuts added
+        minus edges removed) plus the number of its contracted neighbours,
+        it is updated lazily. A shortcut u -> w replacing u -> v -> w is
+        skipped if a hop-limited profile search from u avoiding v finds a
+        function to w dominating link(f_uv, f_vw)
+
+        Loops u -> v -> u are not kept, so cycles are assumed not to gain
+        charge (which holds for the energy costs of MapAPI)
+        """
+        out, inc = self._graph()
+        contracted_neighbours = {vid: 0 for vid in self.v}
+
+        self.rank = {}
+        self.up = {vid: {} for vid in self.v}
+        self.down = {vid: {} for vid in self.v}
+        self.down_in = {vid: {} for vid in self.v}
+        self.middle = {}
+        self.n_shortcuts = 0
+
+        def importance(vid):
+            shortcuts = self._shortcuts(vid, out, inc)
+            return (len(shortcuts) - len(out[vid]) - len(inc[vid])
+                    + contracted_neighbours[vid])
+
+        queue = [(importance(vid), vid) for vid in self.v]
+        heapq.heapify(queue)
+
+        while queue:
+            _, vid = heapq.heappop(queue)
+
+            # Lazy update: contracting vid only if it is still the least important
+            current = importance(vid)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, vid))
+                continue
+
+            for u, w, l in self._shortcuts(vid, out, inc):
+                out[u][w] = break_points_list.merge(out[u][w], l, self.M) if w in out[u] else l
+                inc[w][u] = out[u][w]
+                self.middle.setdefault((u, w), []).append(vid)
+                self.n_shortcuts += 1
+
+            self.rank[vid] = len(self.rank)
+            self.up[vid] = out.pop(vid)
+            for w in self.up[vid]:
+                del inc[w][vid]
+                contracted_neighbours[w] += 1
+
+            for u, l in inc.pop(vid).items():
+                self.down[u][vid] = l
+                self.down_in[vid][u] = l
+                del out[u][vid]
+                contracted_neighbours[u] += 1
+
+    def _edges_updated(self, eids):
+        """
+        Shortcuts and witnesses depend on all costs, so a hierarchy which
+        has been built is rebuilt
+        """
+        if self.rank:
+            self.preprocess()
+
+    @with_stats
+    def query(self, sid, tid, b, stats=None):
+        """
+        Final SoC at tid when leaving sid with charge b
+
+        Args:
+        sid: id of the source node
+        tid: id of the target node
+        b: Initial charge
+        stats: If True, (result, helper.stats.Stats) is returned
+
+        Returns:
+        Final charge, -inf if tid is not reachable
+        """
+        soc = {sid: b}
+
+        def relax(x, y, l):
+            if soc.get(x, float('-inf')) > float('-inf'):
+                soc[y] = max(soc.get(y, float('-inf')), break_points_list._f(l, soc[x]))
+
+        with phase(stats, 'closure'):
+            downward = self._closure(tid, self.down_in)
+
+        self._sweep(sid, downward, relax, stats)
+
+        if stats is not None:
+            stats.reached = sum(b_v > float('-inf') for b_v in soc.values())
+
+        return soc.get(tid, float('-inf'))
+
+    @with_stats
+    def profile(self, sid, tid, stats=None):
+        """
+        SoC function (list of break points) from sid to tid
+
+        Args:
+        sid: id of the source node
+        tid: id of the target node
+        stats: If True, (result, helper.stats.Stats) is returned
+        """
+        f = {sid: [
+            break_point.new(0, 0, 1),
+            break_point.new(self.M, self.M, 0),
+        ]}
+        link, sort, merge = primitives(stats)
+
+        def relax(x, y, l):
+            if x in f:
+                l_new = sort(link(f[x], l))
+                f[y] = merge(f.get(y, self.unreachable), l_new, self.M)
+
+        with phase(stats, 'closure'):
+            downward = self._closure(tid, self.down_in)
+
+        self._sweep(sid, downward, relax, stats)
+
+        if stats is not None:
+            stats.break_points = {
+                vid: len(l) for vid, l in f.items() if break_points_list.reachable(l)
+            }
+            stats.reached = len(stats.break_points)
+
+        return f.get(tid, self.unreachable)
+
+    @with_stats
+    def table(self, sources, targets, b, stats=None):
+        """
+        Final SoC at each target when leaving each source with charge b
+
+        Args:
+        sources: ids of the source nodes
+        targets: ids of the target nodes
+        b: Initial charge
+        stats: If True, (result, helper.stats.Stats) is returned
+
+        Returns:
+        (len(sources), len(targets)) array, -inf where a target is not
+        reachable (np.isfinite gives the feasibility)
+        """
+        return self._table(sources, targets, np.array([b], dtype=float), stats)[:, :, 0]
+
+    @with_stats
+    def profile_table(self, sources, targets, G=101, stats=None):
+        """
+        Sampled SoC functions from each source to each target
+
+        Args:
+        sources: ids of the source nodes
+        targets: ids of the target nodes
+        G: Number of initial charges, evenly spaced in [0, M]
+            (see helper.soc_grid)
+        stats: If True, (result, helper.stats.Stats) is returned
+
+        Returns:
+        (len(sources), len(targets), G) array of final charges
+        """
+        return self._table(sources, targets, soc_grid.charges(self.M, G), stats)
+
+    def _table(self, sources, targets, xs, stats=None):
+        """
+        One backward search per target selects the downward edges leading
+        to any target, then each source needs one upward sweep and one
+        sweep over these downward edges for all targets at once
+
+        SoC are arrays over the initial charges xs
+        """
+        downward = set()
+        with phase(stats, 'closure'):
+            for tid in targets:
+                downward |= self._closure(tid, self.down_in)
+
+        table = np.full((len(sources), len(targets), len(xs)), float('-inf'))
+
+        for row, sid in enumerate(sources):
+            soc = {sid: xs}
+
+            def relax(x, y, l):
+                if x in soc:
+                    b_y = soc_grid.evaluate(l, soc[x])
+                    soc[y] = np.maximum(soc[y], b_y) if y in soc else b_y
+
+            self._sweep(sid, downward, relax, stats)
+
+            for col, tid in enumerate(targets):
+                if tid in soc:
+                    table[row, col] = soc[tid]
+
+        return table
+
+    def _sweep(self, sid, downward, relax, stats=None):
+        """
+        Relaxing the upward edges reachable from sid in increasing rank,
+        then the downward edges between the nodes of downward (the nodes
+        leading to the target(s)) in decreasing rank
+
+        Upward (downward) edges form a DAG ordered by rank, so each node is
+        final once all edges into it have been relaxed
+        """
+        with phase(stats, 'upward'):
+            upward = self._closure(sid, self.up)
+            for x in sorted(upward, key=self.rank.get):
+                for y, l in self.up[x].items():
+                    relax(x, y, l)
+
+        with phase(stats, 'downward'):
+            for x in sorted(downward, key=self.rank.get, reverse=True):
+                for y, l in self.down[x].items():
+                    if y in downward:
+                        relax(x, y, l)
+
+        if stats is not None:
+            stats.pops += len(upward) + len(downward)
+            stats.relaxations += sum(len(self.up[x]) for x in upward) + sum(
+                y in downward for x in downward for y in self.down[x])
+
+    def _closure(self, vid, edges):
+        """
+        Nodes reachable from vid over edges (dictionary of dictionaries)
+        """
+        seen, stack = {vid}, [vid]
+
+        while stack:
+            for y in edges[stack.pop()]:
+                if y not in seen:
+                    seen.add(y)
+                    stack.append(y)
+
+        return seen
+
+    def _graph(self):
+        """
+        Adjacency dictionaries of the edge functions, parallel edges are
+        merged and loops are dropped
+
+        Returns:
+        out[u][v] and inc[v][u]: Function of the edge u -> v
+        """
+        out = {vid: {} for vid in self.v}
+        inc = {vid: {} for vid in self.v}
+
+        for e in self.e.values():
+            u, v = e['u'], e['v']
+            if u == v:
+                continue
+
+            l = break_point.init(e, self.M)
+            out[u][v] = break_points_list.merge(out[u][v], l, self.M) if v in out[u] else l
+            inc[v][u] = out[u][v]
+
+        return out, inc
+
+    def _shortcuts(self, vid, out, inc):
+        """
+        Shortcuts (u, w, function) needed to contract vid
+        """
+        shortcuts = []
+
+        for u, f_uv in inc[vid].items():
+            targets = {}
+            for w, f_vw in out[vid].items():
+                if w == u:
+                    continue
+
+                l = break_points_list.sort(break_points_list.link(f_uv, f_vw))
+                if break_points_list.reachable(l):
+                    targets[w] = l
+
+            if not targets:
+                continue
+
+            witness = self._witness_search(u, vid, out, targets)
+
+            for w, l in targets.items():
+                if w in witness and break_points_list.dominates(witness[w], l):
+                    continue
+                shortcuts.append((u, w, l))
+
+        return shortcuts
+
+    def _witness_search(self, uid, vid, out, targets):
+        """
+        Hop-limited profile search from uid avoiding vid
+
+        Returns:
+        Dictionary of the SoC functions of the nodes found
+        """
+        f = {uid: [
+            break_point.new(0, 0, 1),
+            break_point.new(self.M, self.M, 0),
+        ]}
+        frontier = {uid}
+
+        for _ in range(self.hop_limit):
+            updated = set()
+
+            for x in frontier:
+                for y, l in out[x].items():
+                    if y == vid or y == uid:
+                        continue
+
+                    l_new = break_points_list.sort(break_points_list.link(f[x], l))
+                    if not break_points_list.reachable(l_new):
+                        continue
+
+                    merged = break_points_list.merge(
+                        f.get(y, self.unreachable), l_new, self.M)
+                    if merged != f.get(y):
+                        f[y] = merged
+                        updated.add(y)
+
+            frontier = updated
+            if not frontier or all(
+                    w in f and break_points_list.dominates(f[w], l)
+                    for w, l in targets.items()):
+                break
+
+        return f
@@ -1,7 +1,9 @@
+import os
 import random
 import time
 import sys
-from copy import deepcopy
+import numpy as np
+from multiprocessing import get_context
 from .floyd_warshall_profile import FloydWarshallProfile
 from .helper import break_points_list as bp_list
 from .helper import matrix as matrix_helper
@@ -10,7 +12,8 @@ from .helper import break_point
 class CSFloydWarshall(FloydWarshallProfile):
     """Floyd-Warshall algorithm with Charging Station"""
 
-    def __init__(self, area, M, n_nodes=None, n_stations=None, testing=False, station_id=None):
+    def __init__(self, area, M, n_nodes=None, n_stations=None, testing=False, station_id=None,
+                 checkpoint=None, checkpoint_every=1, scc=None, graph=None, profile=None):
         """
         Initializing CSFloydWarshall
 
@@ -18,16 +21,29 @@ class CSFloydWarshall(FloydWarshallProfile):
         :param M: Maximum battery capacity
         :param n_nodes: Number of nodes to be considered
             (if None, it includes all nodes within the area)
+        :param checkpoint: If given, path of a Floyd-Warshall checkpoint file,
+            the run is resumed from it if it exists
+        :param checkpoint_every: Number of pivots between checkpoints
+        :param scc: see EVRouting
+        :param graph: see EVRouting
+        :param profile: see EVRouting
         """
-        FloydWarshallProfile.__init__(self, area, M, n=n_nodes, testing=testing)
+        FloydWarshallProfile.__init__(self, area, M, n=n_nodes, testing=testing,
+                                      scc=scc, graph=graph, profile=profile)
 
         start_time = time.time()
-        self.run()  # Result will be set in self.matrix
+        # Result will be set in self.matrix
+        if checkpoint and os.path.exists(checkpoint):
+            self.resume(checkpoint, checkpoint_every=checkpoint_every)
+        else:
+            self.run(checkpoint=checkpoint, checkpoint_every=checkpoint_every)
         self.dt_FW = time.time() - start_time
+        self.fw_matrix = self.matrix
 
         self.M = M
         self.n_nodes = n_nodes if n_nodes else len(self.v)
         self.n_stations = n_stations if n_stations else int(.1 * self.n_nodes)
+        self.station_id = []
 
         if self.n_stations > 0:
             if station_id is None:
@@ -36,95 +52,339 @@ class CSFloydWarshall(FloydWarshallProfile):
                     random.choice(range(self.n_nodes)) for _ in range(self.n_stations)
                 ]))
             else:
-                self.station_id = station_id
+                self.station_id = list(station_id)
 
-            self.station_vid = [self.vid[i] for i in self.station_id]
-            self.n_stations = len(self.station_id)
+        self.station_vid = [self.vid[i] for i in self.station_id]
+        self.n_stations = len(self.station_id)
 
         self.stations = []
         self.min_costs = []
+        # SoC at each node after charging at each station (set by final)
+        self.station_socs = None
         start_time = time.time()
         self._stations_graph()
         self.dt_stations_graph = time.time() - start_time
 
     def _stations_graph(self):
-        def fill_min_costs(i, j):
-            if i == j:
-                return 0
-            e = self.map.connected(self.vid[i], self.vid[j])
-            if e:
-                return e['cost'] if e['cost'] <= self.M else float('inf')
-            else:
-                return float('inf')
+        """
+        Minimum costs between all nodes (ignoring the battery) and the
+        shortest paths between stations
+
+        The closure runs on a NumPy array, one broadcast min-plus update per
+        pivot, and paths are rebuilt from the array of pivots (helper)
+        """
+        index = {vid: i for i, vid in enumerate(self.vid[:self.n_nodes])}
+
+        self.min_costs = np.full((self.n_nodes, self.n_nodes), np.inf)
+        np.fill_diagonal(self.min_costs, 0)
+        connected = np.zeros((self.n_nodes, self.n_nodes), dtype=bool)
 
-        self.min_costs = matrix_helper.init(self.n_nodes, self.n_nodes, fill_min_costs)
-        helper = matrix_helper.zeros(self.n_nodes, self.n_nodes, by=None)
+        for i in range(self.n_nodes):
+            for eid in self.v[self.vid[i]]['outgoing']:
+                e = self.e[eid]
+                j = index.get(e['v'])
+
+                # Like map.connected, the first edge from i to j is taken
+                if j is None or j == i or connected[i, j]:
+                    continue
+
+                connected[i, j] = True
+                if e['cost'] <= self.M:
+                    self.min_costs[i, j] = e['cost']
+
+        # Pivot of the shortest path from i to j (-1: direct edge)
+        helper = np.full((self.n_nodes, self.n_nodes), -1, dtype=np.int64)
 
         for k in range(self.n_nodes):
-            for i in range(self.n_nodes):
-                for j in range(self.n_nodes):
-                    ik_cost = self.min_costs[i][k]
-                    kj_cost = self.min_costs[k][j]
-                    ikj_cost = ik_cost + kj_cost
-                    ij_cost = self.min_costs[i][j]
-                    if ikj_cost < ij_cost:
-                        self.min_costs[i][j] = ikj_cost
-                        helper[i][j] = k
-
-        def get_path(i, j):
-            if helper[i][j]:
-                path_ik = get_path(i, helper[i][j])
-                path_kj = get_path(helper[i][j], j)
-                return path_ik + path_kj
-            else:
-                if float('inf') > self.min_costs[i][j] > 0:
-                    return [(i, j, self.min_costs[i][j])]
-                else:
-                    return []
+            ikj_costs = self.min_costs[:, k:k + 1] + self.min_costs[k:k + 1, :]
+            shorter = ikj_costs < self.min_costs
+            self.min_costs[shorter] = ikj_costs[shorter]
+            helper[shorter] = k
+
+        self.min_cost_pivots = helper.tolist()
 
         self.stations = matrix_helper.zeros(self.n_nodes, self.n_nodes, by=[])
         for i in self.station_id:
             for j in self.station_id:
-                self.stations[i][j] = get_path(i, j)
+                self.stations[i][j] = self._path(i, j)
+
+    def _path(self, i, j):
+        """
+        Edges (i, j, cost) of the minimum cost path from node i to node j
+        """
+        path = []
+        stack = [(i, j)]
+
+        while stack:
+            i, j = stack.pop()
+            k = self.min_cost_pivots[i][j]
 
-    def final(self):
+            if k >= 0:
+                stack.append((k, j))
+                stack.append((i, k))
+            elif float('inf') > self.min_costs[i, j] > 0:
+                path.append((i, j, float(self.min_costs[i, j])))
+
+        return path
+
+    def add_station(self, i):
         """
-        Tozih
-        :return:
+        Adding node i to the charging stations
+
+        Paths to and from the other stations are added and, if final has
+        been run, only the cells of self.matrix whose combination changes
+        are recomputed
+
+        :param i: Index of the node
+        :return: Cells (i, j) of self.matrix which were recomputed
         """
-        def fill_final_min_costs(i, j):
-            return bp_list.mim_reachable_charge(self.matrix[i][j])
+        if i in self.station_id:
+            return []
+
+        old_stations = list(self.station_id)
+        self.station_id.append(i)
+        self.station_vid.append(self.vid[i])
+        self.n_stations += 1
 
-        c_new = matrix_helper.init(self.n_nodes, self.n_nodes, fill_final_min_costs)
+        for s in self.station_id:
+            self.stations[i][s] = self._path(i, s)
+            self.stations[s][i] = self._path(s, i)
+
+        return self._update_final(old_stations)
+
+    def remove_station(self, i):
+        """
+        Removing node i from the charging stations (see add_station)
+
+        :param i: Index of the node
+        :return: Cells (i, j) of self.matrix which were recomputed
+        """
+        if i not in self.station_id:
+            return []
+
+        old_stations = list(self.station_id)
+        k = self.station_id.index(i)
+        del self.station_id[k]
+        del self.station_vid[k]
+        self.n_stations -= 1
+
+        for s in old_stations:
+            self.stations[i][s] = []
+            self.stations[s][i] = []
+
+        return self._update_final(old_stations)
+
+    def _station_socs(self):
+        """
+        SoC at each node after charging the battery to M at each station,
+        driving directly or via further stations
+
+        Station t can be reached from station s if it can be reached with
+        a full battery, the reachable stations are closed transitively.
+        The battery is never charged at the target itself
+
+        :return: (number of stations, n_nodes) array (-inf: unreachable)
+        """
+        stations = self.station_id
+
+        # SoC at j when leaving station s with a full battery ...
+        direct = np.array([
+            [bp_list._f(self.fw_matrix[s][j], self.M) for j in range(self.n_nodes)]
+            for s in stations
+        ], dtype=float).reshape(len(stations), self.n_nodes)
+        reaches = direct[:, stations] >= 0
+
+        # ... or after charging again at any station reachable from s
+        socs = _via_stations(reaches, direct)
+
+        # Stations as targets, without charging at them on the way
+        for k, j in enumerate(stations):
+            others = reaches.copy()
+            others[k, :] = False
+            others[:, k] = False
+            socs[:, j] = _via_stations(others, direct[:, j:j + 1])[:, 0]
+
+        return socs
+
+    def repair(self, eids):
+        """
+        Recomputing the Floyd-Warshall cells whose paths may pass through
+        changed edges (see FloydWarshallProfile.repair), the stations graph
+        and, if final has been run, the affected cells of self.matrix
+
+        :param eids: Ids of the changed edges
+        :return: Cells (i, j) of self.fw_matrix which were recomputed
+        """
+        cells = self._repair(self.fw_matrix, eids)
+
+        self._stations_graph()
+        self._update_final(self.station_id, cells)
+
+        return cells
+
+    def _update_final(self, old_stations, fw_cells=()):
+        """
+        Recomputing the cells of self.matrix affected by a change of the
+        stations from old_stations to self.station_id, or of the cells
+        fw_cells of self.fw_matrix
+        """
+        if self.station_socs is None:
+            return []
+
+        # Columns j of row i whose profiles changed, all of them if the
+        # profile from i to a station changed
+        fw_columns = {}
+        for i, j in fw_cells:
+            columns = range(self.n_nodes) if j in self.station_id else [j]
+            fw_columns.setdefault(i, set()).update(columns)
+
+        old_socs = dict(zip(old_stations, self.station_socs))
+        self.station_socs = self._station_socs()
+        new_socs = dict(zip(self.station_id, self.station_socs))
+
+        # Columns j for which the SoC after charging at station s changed
+        changed = {}
+        for s in set(old_socs) | set(new_socs):
+            old = old_socs.get(s, np.full(self.n_nodes, -np.inf))
+            new = new_socs.get(s, np.full(self.n_nodes, -np.inf))
+            columns = np.flatnonzero(old != new)
+
+            if len(columns):
+                changed[s] = columns
+
+        socs = self.station_socs.tolist()
+        cells = []
 
         for i in range(self.n_nodes):
-            for j in range(self.n_nodes):
+            columns = set(fw_columns.get(i, ()))
+            for s, s_columns in changed.items():
+                if bp_list.reachable(self.fw_matrix[i][s]):
+                    columns.update(s_columns.tolist())
+            columns.discard(i)
 
-                if i == j:
-                    continue
+            if not columns:
+                continue
+
+            reached = _reached_stations(self.fw_matrix, i, self.station_id)
+            for j in sorted(columns):
+                self.matrix[i][j] = _final_cell(
+                    self.fw_matrix, i, j, reached, socs, self.M)
+                cells.append((i, j))
+
+        return cells
+
+    def final(self, workers=None):
+        """
+        Combining the Floyd-Warshall profiles with stops at charging
+        stations, where the battery is charged to M (self.matrix is
+        replaced by the combined profiles)
+
+        The SoC at each target after charging at each station, possibly
+        charging again at further stations, is computed once. For each
+        source only the stations which can improve the current profile
+        are merged
+
+        :param workers: Number of processes the rows are split over
+            (if None or 1, all rows are processed in this process)
+        """
+        self.station_socs = self._station_socs()
+        state = (self.fw_matrix, self.station_id, self.station_socs.tolist(), self.M)
+
+        if workers and workers > 1:
+            with get_context().Pool(workers, initializer=_set_final_state,
+                                    initargs=(state,)) as pool:
+                matrix = pool.map(_final_row, range(self.n_nodes))
+        else:
+            _set_final_state(state)
+            matrix = [_final_row(i) for i in range(self.n_nodes)]
+            _set_final_state(None)
+
+        self.matrix = matrix
+
+
+def _via_stations(reaches, direct):
+    """
+    :param reaches: Boolean (s, s) array, station t can be reached from
+        station s with a full battery
+    :param direct: (s, n) array of the SoCs when leaving the stations
+        with a full battery
+    :return: (s, n) array of the SoCs when charging at any station in the
+        transitive closure of reaches
+    """
+    reaches = reaches.copy()
+    for k in range(len(reaches)):
+        reaches |= reaches[:, k:k + 1] & reaches[k:k + 1, :]
+
+    via_station = np.where(reaches[:, :, None], direct[None, :, :], -np.inf)
+
+    return np.max(via_station, axis=1, initial=-np.inf)
+
+
+# Floyd-Warshall matrix, station ids, SoCs after charging at the stations
+# and M used by _final_row
+_final_state = None
+
+
+def _set_final_state(state):
+    global _final_state
+    _final_state = state
+
+
+def _final_row(i):
+    """
+    Row i of the combined profiles of CSFloydWarshall.final
+    """
+    matrix, stations, socs, M = _final_state
+
+    row = list(matrix[i])
+    reached = _reached_stations(matrix, i, stations)
+
+    for j in range(len(row)):
+        if i != j:
+            row[j] = _final_cell(matrix, i, j, reached, socs, M)
+
+    return row
+
+
+def _reached_stations(matrix, i, stations):
+    """
+    :return: Triples (position, node, minimum charge) of the stations
+        reachable from node i
+    """
+    return [(k, s, bp_list.mim_reachable_charge(matrix[i][s]))
+            for k, s in enumerate(stations) if bp_list.reachable(matrix[i][s])]
+
+
+def _final_cell(matrix, i, j, reached, socs, M):
+    """
+    Profile from i to j, charging at one of the reached stations if the
+    initial charge is enough to get there
+    """
+    final_soc = matrix[i][j]
+
+    for k, _, r in reached:
+        soc = socs[k][j]
 
-                final_soc = deepcopy(self.matrix[i][j])
+        # Profiles are non-decreasing, so the step to soc at r only
+        # improves final_soc if it is higher at r
+        if soc == float('-inf') or bp_list._f(final_soc, r) >= soc:
+            continue
 
-                i_reaches_s = [bp_list.reachable(self.matrix[i][s]) for s in self.station_id]
-                s_reaches_j = [bp_list.reachable(self.matrix[s][j]) for s in self.station_id]
+        final_soc = bp_list.merge(final_soc, _step(r, soc, M), M)
 
-                for si_id, si in enumerate(self.station_id):
-                    if not i_reaches_s[si_id]:
-                        continue
-                    for sj_id, sj in enumerate(self.station_id):
-                        if not s_reaches_j[sj_id]:
-                            continue
-                        # si: index of 1st station in self.matrix
-                        # sj: index of 2nd station in self.matrix
+    return final_soc
 
-                        bp_id = bp_list.search_range(self.matrix[sj][j], 0)
-                        sj_j_cost = self.matrix[sj][j][bp_id][0]
-                        si_sj_cost = self.min_costs[si_id][sj_id]
 
-                        if si_sj_cost + sj_j_cost < c_new[si][j]:
-                            c_new[si][j] = si_sj_cost + sj_j_cost
+def _step(r, soc, M):
+    """
+    Break points of the function which is soc from charge r on and -inf
+    below it
+    """
+    step = [break_point.new(r, soc, 0)]
 
-                    if c_new[si][j] < float('inf'):
-                        final_soc = bp_list.disconnected_merge(self.matrix[i][si], c_new[si][j], final_soc, 0, self.M)
+    if r > 0:
+        step.insert(0, break_point.new(0, float('-inf'), 0))
+    if r < M:
+        step.append(break_point.new(M, soc, 0))
 
-                self.matrix[i][j] = deepcopy(final_soc)
+    return step
@@ -1,16 +1,23 @@
+import heapq
+import numpy as np
 from .main import EVRouting
+from .helper.stats import with_stats, phase
 
 
 class Dijkstra(EVRouting):
     """Dijkstra"""
 
-    def __init__(self, area, testing=False):
+    def __init__(self, area, testing=False, scc=None, graph=None, profile=None):
         """
         Initializing Dijkstra class by calling EVRouting initializer
         """
-        EVRouting.__init__(self, area, testing=testing)
+        EVRouting.__init__(self, area, testing=testing, scc=scc, graph=graph, profile=profile)
 
-    def dijkstra(self, s, t, bs, M=float('inf')):
+        # index[vid]: Position of vid in self.vid
+        self.index = {vid: i for i, vid in enumerate(self.vid)}
+
+    @with_stats
+    def dijkstra(self, s, t, bs, M=float('inf'), stats=None):
         """
         EV Dijkstra Algorithm
 
@@ -19,7 +26,20 @@ class Dijkstra(EVRouting):
         t -- id of the target node
         bs -- charging level at start node
         M -- maximum charge level
+        stats -- If True, (result, helper.stats.Stats) is returned
+
+        If landmarks have been set (see set_landmarks), the node with the
+        highest SoC minus the lower bound on its consumption to t is taken
+        first, nodes which cannot reach t with their SoC are not queued and
+        the search stops once t is taken instead of once t is reached.
+        Queries between components which do not reach each other (see
+        MapAPI.prune_components) or rejected by the feasibility oracle
+        (see set_feasibility) return at once
         """
+        bound = {vid: 0 for vid in self.v}
+        if self.landmarks is not None:
+            with phase(stats, 'potential'):
+                bound = dict(zip(self.landmarks.vid, self.landmarks.lower_bounds(t).tolist()))
 
         def f_e(bu, c):
             bv = bu - c
@@ -32,17 +52,36 @@ class Dijkstra(EVRouting):
         def default_SoC(b=float('-inf'), prev=-1):
             return {'b': b, 'prev': prev}
 
+        # Rejecting definitely unreachable targets before searching
+        with phase(stats, 'feasibility'):
+            rejected = not self.map.reachable(s, t) or (
+                self.feasibility is not None and not self.feasibility.feasible(s, t, bs))
+
+        if rejected:
+            return default_SoC(), {s: default_SoC(bs)}, []
+
         Q = {s: bs}
 
         SoC = {}
         SoC[s] = default_SoC(bs)
 
+        if stats is not None:
+            stats.pushes += 1
+
         target_reached = False
 
         while len(Q) > 0:
-            u = max(Q, key=lambda k: Q[k])
+            u = max(Q, key=lambda k: Q[k] - bound[k])
             bu = Q.pop(u)
 
+            if stats is not None:
+                stats.pops += 1
+
+            # With landmarks the SoC of t is final once t is taken
+            if u == t and self.landmarks is not None:
+                target_reached = True
+                break
+
             for eid in self.v[u]['outgoing']:
                 e = self.e[eid]
                 v = e['v']
@@ -50,18 +89,28 @@ class Dijkstra(EVRouting):
                 bv = SoC[v]['b'] if v in SoC else float('-inf')
                 bv_new = f_e(bu, c)
 
-                if bv_new > bv:
+                if bv_new > bv and bv_new - bound[v] >= 0:
                     Q[v] = bv_new
                     SoC[v] = default_SoC(bv_new, u)
 
-                if v == t:
-                    print('Target has reached!')
+                    if stats is not None:
+                        stats.pushes += 1
+                elif stats is not None and bv_new > bv:
+                    stats.prunes += 1
+
+                if stats is not None:
+                    stats.relaxations += 1
+
+                if v == t and v in SoC and self.landmarks is None:
                     target_reached = True
                     break
 
             if target_reached:
                 break
 
+        if stats is not None:
+            stats.reached = len(SoC)
+
         if target_reached:
             trace = [t]
 
@@ -73,3 +122,68 @@ class Dijkstra(EVRouting):
             return SoC[t], SoC, trace
         else:
             return default_SoC(), SoC, []
+
+    @with_stats
+    def isochrone(self, s, bs, M=float('inf'), b_min=0, stats=None):
+        """
+        Nodes reachable from s with a charge of bs
+
+        Nodes are taken in decreasing SoC from a heap (a node may be taken
+        again if its SoC increases over a negative cost), a node is not
+        queued once its SoC would drop below b_min
+
+        Keyword arguments:
+        s -- id of the start node
+        bs -- charging level at start node
+        M -- maximum charge level
+        b_min -- lowest SoC a node is reached with
+        stats -- If True, (result, helper.stats.Stats) is returned
+
+        Return:
+        nodes -- Array of the indices (in self.vid) of the reachable nodes
+        soc -- Array of their SoC
+        boundary -- Array of the ids of the edges leaving reachable nodes
+            towards nodes which are not reachable
+        """
+        SoC = {s: min(bs, M)}
+        Q = [(-SoC[s], s)]
+
+        if stats is not None:
+            stats.pushes += 1
+
+        while Q:
+            bu, u = heapq.heappop(Q)
+            if -bu < SoC[u]:
+                continue
+
+            if stats is not None:
+                stats.pops += 1
+                stats.relaxations += len(self.v[u]['outgoing'])
+
+            for eid in self.v[u]['outgoing']:
+                e = self.e[eid]
+                bv = min(SoC[u] - e['cost'], M)
+
+                if bv >= b_min and bv > SoC.get(e['v'], float('-inf')):
+                    SoC[e['v']] = bv
+                    heapq.heappush(Q, (-bv, e['v']))
+
+                    if stats is not None:
+                        stats.pushes += 1
+                elif stats is not None and bv < b_min:
+                    stats.prunes += 1
+
+        if stats is not None:
+            stats.reached = len(SoC)
+
+        nodes = sorted(self.index[vid] for vid in SoC)
+        boundary = [
+            eid for vid in SoC for eid in self.v[vid]['outgoing']
+            if self.e[eid]['v'] not in SoC
+        ]
+
+        return (
+            np.array(nodes, dtype=np.int64),
+            np.array([SoC[self.vid[i]] for i in nodes], dtype=np.float64),
+            np.array(sorted(boundary), dtype=np.int64),
+        )
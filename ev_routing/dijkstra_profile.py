@@ -1,13 +1,15 @@
 from .main import EVRouting
 from .helper import break_point
 from .helper import break_points_list
-from copy import deepcopy
+from .helper import packing
+from .helper.stats import with_stats, primitives, phase
+import heapq
 
 
 class DijkstraProfile(EVRouting):
     """Dijkstra profile"""
 
-    def __init__(self, area, M, testing=False):
+    def __init__(self, area, M, testing=False, scc=None, graph=None, profile=None):
         """
         Initializing DijkstraProfile class
         by calling EVRouting initializer
@@ -15,24 +17,111 @@ class DijkstraProfile(EVRouting):
         Args:
         area:
         M: Maximum battery capacity
+        scc: see EVRouting
+        graph: see EVRouting
+        profile: see EVRouting
         """
-        EVRouting.__init__(self, area, testing=testing)
+        EVRouting.__init__(self, area, testing=testing, scc=scc, graph=graph, profile=profile)
 
         self.M = M
 
-    def run(self, sid, tid):
+    @with_stats
+    def run(self, sid, tid, stats=None):
         """
         EV Dijkstra profile search
 
         Map every possible initial state of charges (SoCs) at source node
         to its optimal SoC at target node
 
+        Targets in components not reached from sid (see
+        MapAPI.prune_components) or rejected by the feasibility oracle
+        (see set_feasibility) even with a full battery are returned
+        unreachable at once
+
         Args:
         sid: id of the source node
         tid: id of the target node
+        stats: If True, (result, helper.stats.Stats) is returned
+        """
+        with phase(stats, 'feasibility'):
+            rejected = not self.map.reachable(sid, tid) or (
+                self.feasibility is not None
+                and not self.feasibility.feasible(sid, tid, self.M))
+
+        if rejected:
+            return [
+                break_point.new(0, float('-inf'), 0),
+                break_point.new(self.M, float('-inf'), 0),
+            ]
+
+        return self._search(sid, [tid], stats)[tid]
+
+    @with_stats
+    def run_one_to_all(self, sid, stats=None):
+        """
+        Profile search from sid to all nodes (without target pruning)
+
+        Args:
+        sid: id of the source node
+        stats: If True, (result, helper.stats.Stats) is returned
+
+        Returns:
+        (ids of the reached nodes, offsets, break_points) where the SoC
+        function of the k-th reached node is
+        break_points[offsets[k]:offsets[k + 1]] (see helper.packing)
+        """
+        f = self._search(sid, stats=stats)
+        vids = [vid for vid in self.v if break_points_list.reachable(f[vid])]
+
+        offsets, break_points = packing.pack([[f[vid] for vid in vids]])
+
+        return vids, offsets, break_points
+
+    @with_stats
+    def run_many(self, sid, tids, stats=None):
+        """
+        Profile search from sid to several targets, a node is only pruned
+        if it cannot improve any of the targets
+
+        Args:
+        sid: id of the source node
+        tids: ids of the target nodes
+        stats: If True, (result, helper.stats.Stats) is returned
+
+        Returns:
+        Dictionary of the SoC functions (lists of break points) of the targets
+        """
+        f = self._search(sid, tids, stats)
+
+        return {tid: f[tid] for tid in tids}
+
+    def _search(self, sid, tids=None, stats=None):
+        """
+        Profile search from sid, pruning against the targets tids if given
+
+        If landmarks have been set (see set_landmarks) and targets are given,
+        the lower bounds on the consumption to the closest target are used
+        as potential and nodes which cannot reach any target are skipped
+
+        Args:
+        sid: id of the source node
+        tids: ids of the target nodes (if None, no target pruning)
+        stats: helper.stats.Stats to be filled (if None, nothing is counted)
+
+        Returns:
+        Dictionary of the SoC functions (lists of break points) of all nodes
         """
         Q, f = {}, {}
-        potential = self._potential()
+        heap = []
+
+        link, sort, merge = primitives(stats)
+        target_prune = self._target_prune
+        if stats is not None:
+            target_prune = stats.timed('prune', target_prune)
+
+        alt = bool(tids) and self.landmarks is not None
+        with phase(stats, 'potential'):
+            potential = self.landmarks.potential(tids) if alt else self._potential()
 
         for vid in self.v:
             f[vid] = [
@@ -45,35 +134,68 @@ class DijkstraProfile(EVRouting):
             break_point.new(self.M, self.M, 0),
         ]
 
+        # Q holds the current key of each queued node, the heap may also
+        # hold outdated entries which are skipped
         Q[sid] = 0 + potential[sid]
+        heapq.heappush(heap, (Q[sid], 0, sid))
+        pushed = 1
+
+        if stats is not None:
+            stats.pushes += 1
+
+        while heap:
+            key, _, uid = heapq.heappop(heap)
+            if Q.get(uid) != key:
+                continue
 
-        while len(Q) > 0:
-            uid = min(Q, key=lambda k: Q[k])
             del Q[uid]
             u = self.v[uid]
 
+            if stats is not None:
+                stats.pops += 1
+
             for eid in u['outgoing']:
                 e = self.e[eid]
                 vid = e['v']
 
-                if self._target_prune(f[vid], f[tid]):
-                    print('Target pruning has been True')
+                if stats is not None:
+                    stats.relaxations += 1
+
+                if alt and potential[vid] > self.M:
+                    if stats is not None:
+                        stats.prunes += 1
+                    continue
+
+                if tids and all(target_prune(f[vid], f[tid]) for tid in tids):
+                    if stats is not None:
+                        stats.prunes += 1
                     continue
 
                 f_u = f[uid]
-                f_v = deepcopy(f[vid])
+                f_v = f[vid]
                 f_e = break_point.init(e, self.M)
 
-                l = break_points_list.sort(break_points_list.link(f_u, f_e))
+                l = sort(link(f_u, f_e))
 
-                f[vid] = break_points_list.merge(f[vid], l, self.M)
+                f[vid] = merge(f[vid], l, self.M)
 
                 keys = [bp[0] - bp[1] for bp in f[vid] if bp not in f_v]
 
                 if keys:
                     Q[vid] = potential[vid] + min(keys)
+                    heapq.heappush(heap, (Q[vid], pushed, vid))
+                    pushed += 1
+
+                    if stats is not None:
+                        stats.pushes += 1
+
+        if stats is not None:
+            stats.break_points = {
+                vid: len(l) for vid, l in f.items() if break_points_list.reachable(l)
+            }
+            stats.reached = len(stats.break_points)
 
-        return f[tid]
+        return f
 
     def _alpha(self):
         """
@@ -96,7 +218,9 @@ class DijkstraProfile(EVRouting):
                 else:
                     q_down.append(alpha_e[eid])
 
-        alpha_max, alpha_min = int(max(q_up)), int(min(q_down))
+        # Without any elevation difference the potential is constant
+        alpha_max = int(max(q_up, default=1))
+        alpha_min = int(min(q_down, default=1))
 
         return 1 if alpha_min <= 1 <= alpha_max else 2
 
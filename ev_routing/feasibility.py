@@ -0,0 +1,35 @@
+from .landmarks import Landmarks
+from .map import scc
+
+
+class FeasibilityOracle:
+    """Quick rejection of queries which are unreachable with a given charge"""
+
+    def __init__(self, evr, k=4):
+        """
+        Precomputing the strongly connected components, the components
+        reachable from each component and landmark lower bounds
+
+        :param evr: EVRouting instance
+        :param k: Number of landmarks (if evr has none set)
+        """
+        self.component = scc.strongly_connected_components(evr.v, evr.e, scc.is_open)
+        self.reaches = scc.reaches(self.component, evr.e, scc.is_open)
+        self.landmarks = evr.landmarks if evr.landmarks is not None else Landmarks(evr, k)
+
+    def reachable(self, sid, tid):
+        """
+        :return: False if no path leads from sid to tid
+        """
+        return bool(self.reaches[self.component[sid]] >> self.component[tid] & 1)
+
+    def feasible(self, sid, tid, b):
+        """
+        Checking if tid may be reachable from sid with an initial charge b
+
+        A path is needed and the charge has to cover the lower bound on
+        the consumption, which the battery capacity can only increase
+
+        :return: False if tid is definitely not reachable, True otherwise
+        """
+        return self.reachable(sid, tid) and self.landmarks.lower_bound(sid, tid) <= b
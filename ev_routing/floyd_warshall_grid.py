@@ -0,0 +1,104 @@
+import numpy as np
+from .floyd_warshall_profile import FloydWarshallProfile
+from .helper import soc_grid
+from .helper.stats import with_stats
+
+
+class FloydWarshallGrid(FloydWarshallProfile):
+    """Floyd-Warshall profile on sampled SoC functions"""
+
+    def __init__(self, area, M, G=101, n=None, testing=False, scc=None, graph=None, profile=None):
+        """
+        Initializing FloydWarshallGrid class
+        by calling FloydWarshallProfile initializer
+
+        Every SoC function is represented by its final charges at G evenly
+        spaced initial charges in [0, M]
+
+        :param area:
+        :param M: Maximum battery capacity
+        :param G: Number of sampled initial charges
+        :param n: Number of nodes to be considered
+            (if None, it includes all nodes within the area)
+        :param scc: see EVRouting
+        :param graph: see EVRouting
+        :param profile: see EVRouting
+        """
+        FloydWarshallProfile.__init__(self, area, M, n=n, testing=testing, scc=scc, graph=graph,
+                                      profile=profile)
+
+        self.G = G
+        self.grid = soc_grid.from_matrix(self.matrix, M, G)
+
+    @with_stats
+    def run(self, stats=None):
+        """
+        Floyd-Warshall on sampled functions
+
+        For each pivot k, row i is linked against the whole row k
+        in one array operation
+
+        :param stats: If True, (None, helper.stats.Stats) is returned,
+            links and merges count row operations
+        """
+        n = self.grid.shape[0]
+        link, merge = soc_grid.link, soc_grid.merge
+        if stats is not None:
+            link = stats.timed('link', link, 'links')
+            merge = stats.timed('merge', merge, 'merges')
+
+        for k in range(n):
+            for i in range(n):
+                y_ik = self.grid[i, k].copy()
+
+                if not np.any(y_ik >= 0):
+                    if stats is not None:
+                        stats.prunes += 1
+                    continue
+
+                self.grid[i] = merge(self.grid[i], link(y_ik, self.grid[k], self.M))
+
+        if stats is not None:
+            stats.reached = int(np.count_nonzero(np.any(self.grid >= 0, axis=2)))
+
+    def repair(self, eids):
+        """
+        Recomputing, after run(), the sampled cells whose paths may pass
+        through changed edges (see FloydWarshallProfile.repair)
+
+        :param eids: Ids of the changed edges
+        :return: Cells (i, j) which were recomputed
+        """
+        n = self.grid.shape[0]
+        xs = soc_grid.charges(self.M, self.G)
+        rows = self._affected_rows(
+            eids, n, lambda i, j: np.any(self.grid[i, j] >= 0))
+
+        for i, cols in rows.items():
+            for j in cols:
+                self.grid[i, j] = soc_grid.evaluate(self._initial_cell(i, j), xs)
+
+        for k in range(n):
+            for i, cols in rows.items():
+                y_ik = self.grid[i, k].copy()
+
+                if not np.any(y_ik >= 0):
+                    continue
+
+                self.grid[i, cols] = soc_grid.merge(
+                    self.grid[i, cols], soc_grid.link(y_ik, self.grid[k, cols], self.M))
+
+        return [(i, j) for i in sorted(rows) for j in rows[i]]
+
+    def break_points_matrix(self):
+        """
+        Converting the sampled matrix into lists of break points
+
+        :return: n x n matrix (list of lists) of lists of break points
+        """
+        n = self.grid.shape[0]
+
+        return [
+            [soc_grid.to_break_points(self.grid[i, j], self.M) for j in range(n)]
+            for i in range(n)
+        ]
@@ -1,13 +1,19 @@
-from copy import deepcopy
+import os
+import numpy as np
 from .main import EVRouting
+from .profile_history import ProfileHistory
+from . import profile_oracle
 from .helper import break_point
 from .helper import break_points_list
+from .helper import break_points_array
+from .helper import packing
+from .helper.stats import with_stats, primitives, phase
 
 
 class FloydWarshallProfile(EVRouting):
     """Floyd-Warshall profile"""
 
-    def __init__(self, area, M, n=None, testing=False):
+    def __init__(self, area, M, n=None, testing=False, scc=None, graph=None, profile=None):
         """
         Initializing FloydWarshallProfile class
         by calling EVRouting initializer
@@ -16,8 +22,11 @@ class FloydWarshallProfile(EVRouting):
         :param M: Maximum battery capacity
         :param n: Number of nodes to be considered
             (if None, it includes all nodes within the area)
+        :param scc: see EVRouting
+        :param graph: see EVRouting
+        :param profile: see EVRouting
         """
-        EVRouting.__init__(self, area, testing=testing)
+        EVRouting.__init__(self, area, testing=testing, scc=scc, graph=graph, profile=profile)
 
         self.matrix = []
         self.M = M
@@ -25,45 +34,295 @@ class FloydWarshallProfile(EVRouting):
         n = n if n else len(self.v)
 
         for i in range(n):
-            row = []
-            for j in range(n):
-                if i == j:
-                    row.append([
-                        break_point.new(0, 0, 1),
-                        break_point.new(M, M, 0),
-                    ])
-                else:
-                    e = self.map.connected(self.vid[i], self.vid[j])
-                    if e:
-                        row.append(break_point.init(e, M))
-                    else:
-                        row.append([
-                            break_point.new(0, float('-inf'), 0),
-                            break_point.new(M, float('-inf'), 0),
-                        ])
-
-            self.matrix.append(row)
-
-    def run(self):
+            self.matrix.append([self._initial_cell(i, j) for j in range(n)])
+
+    def _initial_cell(self, i, j):
+        """
+        Function of the (first) edge from node i to node j
+        """
+        if i == j:
+            return [
+                break_point.new(0, 0, 1),
+                break_point.new(self.M, self.M, 0),
+            ]
+
+        e = self.map.connected(self.vid[i], self.vid[j])
+        if e:
+            return break_point.init(e, self.M)
+
+        return [
+            break_point.new(0, float('-inf'), 0),
+            break_point.new(self.M, float('-inf'), 0),
+        ]
+
+    @with_stats
+    def run(self, max_break_points=None, eps=None,
+            checkpoint=None, checkpoint_every=1, k_start=0, stats=None):
         """
         Args:
+        max_break_points: If given, functions are lower-approximated by
+            at most this many break points (at least 2, functions needing
+            a minimum charge keep 3, see break_points_list.simplify) after
+            each merge
+        eps: If given, break points are dropped as long as the error (in
+            SoC) of each merged segment stays within eps
+        checkpoint: If given, path of a checkpoint file which is (atomically)
+            rewritten every checkpoint_every pivots and at the end
+        checkpoint_every: Number of pivots between checkpoints
+        k_start: First pivot (see resume)
+        stats: If True, (None, helper.stats.Stats) is returned
+
+        The largest error of a single simplification is stored in
+        self.simplify_step_error. Simplified cells are linked again by
+        later pivots, so errors add up and the error of the final matrix
+        can be larger (compare with an unsimplified run to measure it)
         """
         # New set of break points after linking two paths
         l_new = []
         n = len(self.matrix)
+        simplify = max_break_points is not None or eps is not None
+        self.simplify_step_error = 0
 
-        for k in range(n):
+        link, sort, merge = primitives(stats)
+        simplified = break_points_list.simplify
+        if stats is not None:
+            simplified = stats.timed('simplify', simplified)
+
+        for k in range(k_start, n):
             for i in range(n):
                 l_ik = self.matrix[i][k]
 
                 for j in range(n):
                     l_kj = self.matrix[k][j]
 
-                    l_new = break_points_list.link(l_ik, l_kj)
+                    l_new = link(l_ik, l_kj)
+                    l_new = sort(l_new)
+
+                    self.matrix[i][j] = merge(self.matrix[i][j], l_new, self.M)
+
+                    if simplify:
+                        self.matrix[i][j], err = simplified(
+                            self.matrix[i][j], max_break_points, eps)
+                        self.simplify_step_error = max(self.simplify_step_error, err)
+
+            if checkpoint and ((k + 1) % checkpoint_every == 0 or k + 1 == n):
+                with phase(stats, 'checkpoint'):
+                    self.save_checkpoint(checkpoint, k + 1)
+
+        if stats is not None:
+            _matrix_stats(self.matrix, stats)
+
+    def repair(self, eids):
+        """
+        Recomputing, after run(), the cells whose paths may pass through
+        changed edges (see EVRouting.update_edges)
+
+        :param eids: Ids of the changed edges
+        :return: Cells (i, j) which were recomputed
+        """
+        return self._repair(self.matrix, eids)
+
+    def _edges_updated(self, eids):
+        return self.repair(eids)
+
+    def _repair(self, matrix, eids):
+        """
+        A path from i to j can use an edge a -> b only if i reaches a and b
+        reaches j, before the change (read from matrix) or after it (on the
+        updated edges), so only these cells are reset to their edges and
+        updated by all pivots. The other cells already hold their final
+        functions and are read as they are
+
+        :return: Cells (i, j) which were recomputed
+        """
+        n = len(matrix)
+        rows = self._affected_rows(
+            eids, n, lambda i, j: break_points_list.reachable(matrix[i][j]))
+
+        for i, cols in rows.items():
+            for j in cols:
+                matrix[i][j] = self._initial_cell(i, j)
+
+        for k in range(n):
+            for i, cols in rows.items():
+                l_ik = matrix[i][k]
+
+                if not break_points_list.reachable(l_ik):
+                    continue
+
+                for j in cols:
+                    l_new = break_points_list.link(l_ik, matrix[k][j])
                     l_new = break_points_list.sort(l_new)
 
-                    self.matrix[i][j] = break_points_list.merge(
-                        self.matrix[i][j], l_new, self.M)
+                    matrix[i][j] = break_points_list.merge(matrix[i][j], l_new, self.M)
+
+        return [(i, j) for i in sorted(rows) for j in rows[i]]
+
+    def _affected_rows(self, eids, n, reachable):
+        """
+        Cells whose old or new paths may pass through the edges eids
+
+        Old paths are found with the functions before the change, new ones
+        by a search on the updated edges (ignoring the battery), so paths
+        through several changed edges are covered as well
+
+        :param n: Number of nodes of the matrix
+        :param reachable: Function (i, j) checking if j was reachable from i
+        :return: Dictionary {row: sorted list of columns}
+        """
+        index = {vid: i for i, vid in enumerate(self.vid[:n])}
+        rows = {}
+
+        for eid in eids:
+            a, b = index.get(self.e[eid]['u']), index.get(self.e[eid]['v'])
+
+            if a is None or b is None or a == b:
+                continue
+
+            cols = {j for j in range(n) if reachable(b, j)}
+            cols |= self._graph_reach(b, index, 'outgoing', 'v')
+
+            sources = {i for i in range(n) if reachable(i, a)}
+            sources |= self._graph_reach(a, index, 'incoming', 'u')
+
+            for i in sources:
+                rows.setdefault(i, set()).update(cols)
+
+        return {i: sorted(cols) for i, cols in rows.items()}
+
+    def _graph_reach(self, start, index, edges, end):
+        """
+        Matrix nodes reached from the node start along its edges
+        (outgoing, end 'v') or against them (incoming, end 'u'), over
+        the edges of finite cost between matrix nodes
+
+        :return: Set of indices, including start
+        """
+        reached = {start}
+        stack = [start]
+
+        while stack:
+            vid = self.vid[stack.pop()]
+
+            for eid in self.v[vid][edges]:
+                e = self.e[eid]
+                i = index.get(e[end])
+
+                if i is not None and i not in reached and e['cost'] < float('inf'):
+                    reached.add(i)
+                    stack.append(i)
+
+        return reached
+
+    def resume(self, checkpoint, checkpoint_every=1, **kwargs):
+        """
+        Continuing run() from the last completed pivot of a checkpoint
+
+        Args:
+        checkpoint: Path of the checkpoint file (kept up to date)
+        checkpoint_every: Number of pivots between checkpoints
+        kwargs: Further arguments of run()
+        """
+        k = self.load_checkpoint(checkpoint)
+
+        self.run(checkpoint=checkpoint, checkpoint_every=checkpoint_every,
+                 k_start=k, **kwargs)
+
+    def save_checkpoint(self, path, k):
+        """
+        Writing the matrix and the next pivot k to path atomically
+
+        Args:
+        path: Path of the checkpoint file
+        k: Next pivot to be processed
+        """
+        offsets, break_points = packing.pack(self.matrix)
+        tmp = path + '.tmp'
+
+        with open(tmp, 'wb') as handle:
+            np.savez(handle, offsets=offsets, break_points=break_points,
+                     n=len(self.matrix), k=k, M=self.M)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path):
+        """
+        Loading the matrix from a checkpoint into self.matrix
+
+        Args:
+        path: Path of the checkpoint file
+
+        Returns:
+        The next pivot to be processed
+        """
+        with np.load(path) as data:
+            n = int(data['n'])
+
+            if (self.matrix and len(self.matrix) != n) or float(data['M']) != self.M:
+                raise ValueError('Checkpoint does not match this matrix', path)
+
+            self.matrix = packing.unpack(
+                data['offsets'], data['break_points'], (n, n))
+
+            return int(data['k'])
+
+    def export(self, path):
+        """
+        Writing self.matrix to a memory-mapped profile store
+        (see profile_oracle.ProfileOracle)
+
+        Args:
+        path: Directory of the store
+        """
+        profile_oracle.export(self.matrix, self.M, self.vid, path)
+
+    def run_vectorized(self, max_cells=2 ** 16):
+        """
+        Floyd-Warshall profile on padded NumPy arrays
+
+        For each pivot k, rows 0..k (which see row k before its update)
+        and then rows k+1..n-1 are linked against row k and merged in
+        batched array operations. Results are exactly equal to run()
+
+        Args:
+        max_cells: Maximum number of cells processed in one batch
+        """
+        X, F, S, L = break_points_array.from_matrix(self.matrix)
+        n = len(self.matrix)
+        rows_per_batch = max(1, max_cells // n)
+
+        for k in range(n):
+            row_k = X[k].copy(), F[k].copy(), S[k].copy(), L[k].copy()
+
+            for first, last in [(0, k + 1), (k + 1, n)]:
+                for start in range(first, last, rows_per_batch):
+                    rows = slice(start, min(start + rows_per_batch, last))
+                    X, F, S = self._update_rows(X, F, S, L, k, rows, row_k)
+
+                row_k = X[k], F[k], S[k], L[k]
+
+        self.matrix = break_points_array.to_matrix(X, F, S, L)
+
+    def _update_rows(self, X, F, S, L, k, rows, row_k):
+        """
+        Linking matrix[i][k] with row k and merging the result
+        into row i for all rows i in the slice rows (in place on L)
+
+        :return: X, F, S (widened if needed)
+        """
+        ii, jj, X_m, F_m, S_m, L_m = break_points_array.link_and_merge(
+            X[rows, k], F[rows, k], S[rows, k], L[rows, k], *row_k,
+            X[rows], F[rows], S[rows], L[rows], self.M)
+        ii = ii + rows.start
+
+        width = max(X.shape[2], X_m.shape[1])
+        X, F, S = break_points_array.widen(X, F, S, width)
+        X[ii, jj], F[ii, jj], S[ii, jj] = break_points_array.widen(X_m, F_m, S_m, width)
+        L[ii, jj] = L_m
+
+        return X, F, S
 
     def run_with_history(self):
         """
@@ -72,11 +331,12 @@ class FloydWarshallProfile(EVRouting):
         n = len(self.matrix)
 
         history = []
-        matrix = deepcopy(self.matrix)
+        matrix = [list(row) for row in self.matrix]
         history.append(matrix)
 
         for k in range(n):
-            matrix = deepcopy(self.matrix)
+            # Every cell is overwritten below
+            matrix = [list(row) for row in history[k]]
             history.append(matrix)
 
             for i in range(n):
@@ -93,3 +353,48 @@ class FloydWarshallProfile(EVRouting):
 
         return history
 
+    def run_with_delta_history(self, snapshot_every=None, max_bytes=None):
+        """
+        Running Floyd-Warshall profile like run_with_history, but only
+        recording the cells which changed at each pivot
+
+        :param snapshot_every: Storing a full snapshot every this many pivots
+        :param max_bytes: Approximate memory budget of the history,
+            the oldest steps are dropped beyond it
+        :return: ProfileHistory, history[k] reconstructs the matrix at step k
+        """
+        n = len(self.matrix)
+        history = ProfileHistory(self.matrix, snapshot_every, max_bytes)
+        matrix = history.current
+
+        for k in range(n):
+            delta = {}
+
+            for i in range(n):
+                l_ik = matrix[i][k]
+
+                for j in range(n):
+                    l_kj = matrix[k][j]
+
+                    l_new = break_points_list.link(l_ik, l_kj)
+                    l_new = break_points_list.sort(l_new)
+                    l_new = break_points_list.merge(matrix[i][j], l_new, self.M)
+
+                    if l_new != matrix[i][j]:
+                        delta[(i, j)] = l_new
+
+            history.record(delta)
+
+        return history
+
+
+def _matrix_stats(matrix, stats):
+    """
+    Break points of the reachable cells (i, j) of a matrix
+    """
+    stats.break_points = {
+        (i, j): len(l)
+        for i, row in enumerate(matrix) for j, l in enumerate(row)
+        if break_points_list.reachable(l)
+    }
+    stats.reached = len(stats.break_points)
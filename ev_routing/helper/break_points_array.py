@@ -0,0 +1,454 @@
+"""
+Batched break point algebra on padded NumPy arrays
+
+A row of R functions (lists of break points) is stored as three (R, W)
+arrays of initial charges (X), final charges (F) and slopes (S) together
+with the number of break points of each function (L). Padding entries hold
+(+inf, -inf, 0).
+
+The functions below replicate link, sort, merge and
+_remove_redundant_break_points of break_points_list element by element,
+so results are exactly equal to the list based algebra.
+"""
+import numpy as np
+
+PAD = (float('inf'), float('-inf'), 0)
+
+
+def empty(shape, width):
+    """
+    Allocating padded arrays
+
+    Args:
+    shape: Shape of the array of functions
+    width: Maximum number of break points
+
+    Returns:
+    X, F, S, L
+    """
+    X = np.full(shape + (width,), PAD[0])
+    F = np.full(shape + (width,), PAD[1])
+    S = np.zeros(shape + (width,))
+    L = np.zeros(shape, dtype=int)
+
+    return X, F, S, L
+
+
+def from_matrix(matrix):
+    """
+    Converting a matrix (list of lists) of lists of break points
+    into padded arrays of shape (n, m, width)
+    """
+    n, m = len(matrix), len(matrix[0])
+    width = max(len(l) for row in matrix for l in row)
+
+    X, F, S, L = empty((n, m), width)
+
+    for i in range(n):
+        for j in range(m):
+            l = matrix[i][j]
+            L[i, j] = len(l)
+            for b, bp in enumerate(l):
+                X[i, j, b], F[i, j, b], S[i, j, b] = bp
+
+    return X, F, S, L
+
+
+def to_list(X, F, S, L):
+    """
+    Converting the padded arrays of a single function
+    into a list of break points
+    """
+    return [
+        (float(X[b]), float(F[b]), int(S[b])) for b in range(L)
+    ]
+
+
+def to_matrix(X, F, S, L):
+    """
+    Converting padded arrays of shape (n, m, width)
+    into a matrix (list of lists) of lists of break points
+    """
+    n, m = L.shape
+
+    return [
+        [to_list(X[i, j], F[i, j], S[i, j], L[i, j]) for j in range(m)]
+        for i in range(n)
+    ]
+
+
+def widen(X, F, S, width):
+    """
+    Padding arrays along their last axis up to width
+    """
+    extra = width - X.shape[-1]
+
+    if extra <= 0:
+        return X, F, S
+
+    pad = [(0, 0)] * (X.ndim - 1) + [(0, extra)]
+
+    return (
+        np.pad(X, pad, constant_values=PAD[0]),
+        np.pad(F, pad, constant_values=PAD[1]),
+        np.pad(S, pad, constant_values=PAD[2]),
+    )
+
+
+def _interval(X, L, c):
+    """
+    First segment i < L - 1 with X[i] <= c < X[i + 1]
+
+    Args:
+    X: Initial charges, shape (R, W)
+    L: Lengths, shape (R,)
+    c: Charges, shape (R, Q)
+
+    Returns:
+    Segment indices, shape (R, Q), -1 if not found
+    """
+    R, W = X.shape
+
+    if W < 2:
+        return np.full(c.shape, -1)
+
+    cond = (X[:, None, :-1] <= c[..., None]) & (c[..., None] < X[:, None, 1:])
+    cond &= np.arange(W - 1) < (L - 1)[:, None, None]
+
+    return np.where(cond.any(-1), cond.argmax(-1), -1)
+
+
+def _last(A, L):
+    """
+    Last entry of each padded row, shape (R, 1)
+    """
+    return np.take_along_axis(A, np.maximum(L - 1, 0)[:, None], axis=1)
+
+
+def _f(X, F, S, L, c, idx=None):
+    """
+    Batched break_points_list._f, c has shape (R, Q)
+    """
+    idx = _interval(X, L, c) if idx is None else idx
+    at = np.maximum(idx, 0)
+
+    X_i = np.take_along_axis(X, at, axis=1)
+    F_i = np.take_along_axis(F, at, axis=1)
+    S_i = np.take_along_axis(S, at, axis=1)
+
+    y = np.where(S_i == 1, (c - X_i) + F_i, F_i)
+    y = np.where(idx >= 0, y, np.where(c == _last(X, L), _last(F, L), -np.inf))
+
+    return np.where((c == -np.inf) | (c < X[:, :1]), -np.inf, y)
+
+
+def _s(X, S, L, c, idx=None):
+    """
+    Batched break_points_list._s, c has shape (R, Q)
+    """
+    idx = _interval(X, L, c) if idx is None else idx
+    S_i = np.take_along_axis(S, np.maximum(idx, 0), axis=1)
+
+    s = np.where(idx >= 0, S_i, np.where(c == _last(X, L), _last(S, L), 0))
+
+    return np.where(c < X[:, :1], 0, s)
+
+
+def _search_domain(X, L, c):
+    """
+    Batched break_points_list.search_domain, c has shape (R, Q)
+
+    Returns -1 instead of None
+    """
+    X_last = _last(X, L)
+    idx = _interval(X, L, c)
+    idx = np.where(idx >= 0, idx, np.where(c == X_last, (L - 1)[:, None], -1))
+
+    return np.where((c < 0) | (c > X_last), -1, idx)
+
+
+def _search_range(x, f, s, La, c):
+    """
+    Batched break_points_list.search_range, c has shape (R, Q)
+
+    Returns -1 instead of None
+    """
+    A = x.shape[1]
+    cc = c[..., None]
+
+    with np.errstate(invalid='ignore'):
+        cond = np.where(
+            s[:, None, :-1] == 0,
+            cc == f[:, None, :-1],
+            (f[:, None, :-1] <= cc) & (cc < f[:, None, :-1] + (x[:, None, 1:] - x[:, None, :-1])))
+
+    cond &= np.arange(A - 1) < (La - 1)[:, None, None]
+
+    idx = np.where(cond.any(-1), cond.argmax(-1), -1)
+    idx = np.where(idx >= 0, idx, np.where(c == _last(f, La), (La - 1)[:, None], -1))
+
+    return np.where(c < 0, -1, idx)
+
+
+def link(x, f, s, La, X, F, S, L):
+    """
+    Batched break_points_list.link of R pairs of lists of break points
+
+    Args:
+    x, f, s, La: Padded arrays of the R lists l_ik, shape (R, A)
+    X, F, S, L: Padded arrays of the R lists l_kj, shape (R, W)
+
+    Returns:
+    X, F, S and a validity mask of shape (R, A + W),
+    entries in the same order as break_points_list.link appends them
+    """
+    R, W = X.shape
+    A = x.shape[1]
+
+    # Break points of l_ik
+    charge_at_j = _f(X, F, S, L, f)
+    unreachable = charge_at_j == -np.inf
+
+    dom = _search_domain(X, L, f)
+    S_dom = np.take_along_axis(S, np.maximum(dom, 0), axis=1)
+
+    valid1 = unreachable | ((f >= 0) & (dom >= 0))
+    valid1 &= np.arange(A) < La[:, None]
+    S1 = np.where(~unreachable & (s == 1) & (S_dom == 1), 1, 0)
+
+    # Break points of l_kj
+    idx = _search_range(x, f, s, La, X)
+    at = np.maximum(idx, 0)
+    x_idx = np.take_along_axis(x, at, axis=1)
+    f_idx = np.take_along_axis(f, at, axis=1)
+    s_idx = np.take_along_axis(s, at, axis=1)
+
+    with np.errstate(invalid='ignore'):
+        xnew = x_idx + (X - f_idx)
+
+    valid2 = (np.arange(W) < L[:, None]) & (idx >= 0)
+    valid2 &= (s_idx == 0) | ((s_idx == 1) & (0 < xnew) & (xnew < _last(x, La)))
+
+    X2 = np.where(s_idx == 0, x_idx, xnew)
+    S2 = np.where(s_idx == 0, 0, np.where(S == 0, 0, 1))
+
+    return (
+        np.concatenate([x, X2], axis=1),
+        np.concatenate([charge_at_j, F], axis=1),
+        np.concatenate([S1, S2], axis=1),
+        np.concatenate([valid1, valid2], axis=1),
+    )
+
+
+def _compact(X, F, S, keep):
+    """
+    Moving kept entries of each row to the front
+    """
+    L = keep.sum(axis=1)
+    Xc, Fc, Sc, _ = empty((X.shape[0],), max(int(L.max(initial=0)), 1))
+
+    rows, cols = np.nonzero(keep)
+    pos = (np.cumsum(keep, axis=1) - 1)[rows, cols]
+
+    Xc[rows, pos] = X[rows, cols]
+    Fc[rows, pos] = F[rows, cols]
+    Sc[rows, pos] = S[rows, cols]
+
+    return Xc, Fc, Sc, L
+
+
+def sort(X, F, S, valid):
+    """
+    Batched break_points_list.sort
+
+    Among break points with the same initial charge the one with the
+    biggest final charge (the first one on ties) is kept
+
+    Returns:
+    X, F, S, L
+    """
+    R, C = X.shape
+    order = np.broadcast_to(np.arange(C), (R, C))
+    rows = np.broadcast_to(np.arange(R)[:, None], (R, C))
+
+    rows, order = rows[valid], order[valid]
+    x, f = X[valid], F[valid]
+
+    perm = np.lexsort((order, -f, x, rows))
+    rows, x = rows[perm], x[perm]
+
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (x[1:] != x[:-1])
+
+    keep = np.zeros((R, C), dtype=bool)
+    keep[rows[first], order[perm][first]] = True
+
+    # Kept entries have distinct initial charges, sort them within rows
+    Xk = np.where(keep, X, np.inf)
+    by_x = np.argsort(Xk, axis=1, kind='stable')
+
+    return _compact(
+        np.take_along_axis(X, by_x, axis=1),
+        np.take_along_axis(F, by_x, axis=1),
+        np.take_along_axis(S, by_x, axis=1),
+        np.take_along_axis(keep, by_x, axis=1))
+
+
+def merge(X1, F1, S1, L1, X2, F2, S2, L2, M):
+    """
+    Batched break_points_list.merge (point-wise maximum) of two rows
+    of functions
+
+    All rows walk through their break points in lockstep
+
+    Returns:
+    X, F, S, L
+    """
+    R, W1 = X1.shape
+    W2 = X2.shape[1]
+
+    X, F, S, _ = empty((R,), 2 * (W1 + W2))
+    i, j, cnt = np.zeros(R, dtype=int), np.zeros(R, dtype=int), np.zeros(R, dtype=int)
+
+    np_err = np.seterr(invalid='ignore', divide='ignore')
+
+    def next_x(Xo, Lo, r, k):
+        return np.where(k < Lo[r], Xo[r, np.minimum(k, Xo.shape[1] - 1)], np.inf)
+
+    while True:
+        active = (i < L1) | (j < L2)
+        if not active.any():
+            break
+
+        r = np.nonzero(active)[0]
+        ii, jj = i[r], j[r]
+        ii_at, jj_at = np.minimum(ii, W1 - 1), np.minimum(jj, W2 - 1)
+
+        xi = next_x(X1, L1, r, ii)
+        xj = next_x(X2, L2, r, jj)
+
+        c1 = xi < xj
+        c2 = xj < xi
+        x = np.where(c2, xj, xi)
+
+        f1, s1 = F1[r, ii_at], S1[r, ii_at]
+        f2, s2 = F2[r, jj_at], S2[r, jj_at]
+
+        # Evaluating the other function where only one has a break point
+        for case, f, s, (Xo, Fo, So, Lo) in [
+                (c2, f1, s1, (X1, F1, S1, L1)), (c1, f2, s2, (X2, F2, S2, L2))]:
+            if case.any():
+                q, c = r[case], x[case][:, None]
+                idx = _interval(Xo[q], Lo[q], c)
+                f[case] = _f(Xo[q], Fo[q], So[q], Lo[q], c, idx)[:, 0]
+                s[case] = _s(Xo[q], So[q], Lo[q], c, idx)[:, 0]
+
+        choose1 = (f1 > f2) | ((f1 == f2) & (s1 >= s2))
+
+        bf, bs = np.where(choose1, f1, f2), np.where(choose1, s1, s2)
+        f_low, s_low = np.where(choose1, f2, f1), np.where(choose1, s2, s1)
+
+        X[r, cnt[r]], F[r, cnt[r]], S[r, cnt[r]] = x, bf, bs
+        cnt[r] += 1
+
+        i[r] += ~c2
+        j[r] += ~c1
+
+        x_next = np.minimum(next_x(X1, L1, r, i[r]), next_x(X2, L2, r, j[r]))
+
+        # Found intersection
+        xnew = x + (bf - f_low) / (s_low - bs)
+        ins = (s_low > bs) & (f_low > -np.inf) & (xnew < x_next) & (xnew < M)
+
+        ri = r[ins]
+        X[ri, cnt[ri]] = xnew[ins]
+        F[ri, cnt[ri]] = f_low[ins] + s_low[ins] * (xnew[ins] - x[ins])
+        S[ri, cnt[ri]] = s_low[ins]
+        cnt[ri] += 1
+
+    np.seterr(**np_err)
+
+    return remove_redundant_break_points(X, F, S, cnt)
+
+
+def _round(a, sig):
+    """
+    Python's round (correctly rounded) for arrays
+    """
+    r = np.round(a, sig)
+
+    with np.errstate(invalid='ignore'):
+        scaled = np.abs(a) * 10 ** sig
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+    for k in zip(*np.nonzero(near_half)):
+        r[k] = round(float(a[k]), sig)
+
+    return r
+
+
+def remove_redundant_break_points(X, F, S, L, sig=3):
+    """
+    Batched break_points_list._remove_redundant_break_points
+
+    Returns:
+    X, F, S, L
+    """
+    R, W = X.shape
+    keep = np.arange(W) < L[:, None]
+
+    a = np.zeros(R, dtype=int)
+    c = np.ones(R, dtype=int)
+
+    while True:
+        active = (L > 2) & (c <= L - 2)
+        if not active.any():
+            break
+
+        r = np.nonzero(active)[0]
+        ar, cr = a[r], c[r]
+
+        with np.errstate(invalid='ignore'):
+            line = F[r, ar] + S[r, ar] * (X[r, cr] - X[r, ar])
+
+        delete = (S[r, ar] == S[r, cr]) & (_round(line, sig) == _round(F[r, cr], sig))
+
+        keep[r[delete], cr[delete]] = False
+        a[r] = np.where(delete, ar, cr)
+        c[r] += 1
+
+    return _compact(X, F, S, keep)
+
+
+def link_and_merge(x, f, s, La, X_kj, F_kj, S_kj, L_kj, X, F, S, L, M):
+    """
+    Floyd-Warshall update of a block of cells:
+    l_ij = merge(l_ij, sort(link(l_ik, l_kj)))
+
+    Cells where l_ik or l_kj is -inf everywhere are skipped, since merging
+    with an unreachable function returns the function unchanged
+
+    Args:
+    x, f, s, La: Functions l_ik of the m rows of the block, shape (m, A)
+    X_kj, F_kj, S_kj, L_kj: Functions l_kj of the p columns, shape (p, W)
+    X, F, S, L: Functions l_ij of the block, shape (m, p, W')
+    M: Maximum battery capacity
+
+    Returns:
+    (ii, jj) indices of the updated cells within the block
+    and their new X, F, S, L
+    """
+    ii = np.nonzero(f.max(axis=1) > -np.inf)[0]
+    jj = np.nonzero(F_kj.max(axis=1) > -np.inf)[0]
+    ii, jj = np.repeat(ii, len(jj)), np.tile(jj, len(ii))
+
+    if len(ii) == 0:
+        return (ii, jj) + empty((0,), 1)
+
+    X_new, F_new, S_new, valid = link(
+        x[ii], f[ii], s[ii], La[ii], X_kj[jj], F_kj[jj], S_kj[jj], L_kj[jj])
+    X_new, F_new, S_new, L_new = sort(X_new, F_new, S_new, valid)
+
+    return (ii, jj) + merge(
+        X[ii, jj], F[ii, jj], S[ii, jj], L[ii, jj],
+        X_new, F_new, S_new, L_new, M)
@@ -87,6 +87,11 @@ def merge(l1, l2, M):
     """
     Point-wise maximum of two functions (list of break points)
 
+    Both functions are linear between the union of their break points,
+    so at each of them the higher one is taken and, if the lower one is
+    steeper, the point where it overtakes the other before the next
+    break point is inserted
+
     Args:
     l1: Original set of break points
     l2: New set of break points
@@ -96,67 +101,37 @@ def merge(l1, l2, M):
     Point-wise maximum
     """
     merged = []
-    i, j, di, dj = 0, 0, 0, 0
-
-    df_old = 0.0
-    x_old = 0.0
-    f_old = 0.0
-    s_old = 0.0
+    i, j = 0, 0
 
     while i < len(l1) or j < len(l2):
-        if l1[i][0] < l2[j][0]:
-            x = l1[i][0]
-            f1, f2 = l1[i][1], _f(l2, x)
-            s1, s2 = l1[i][2], _s(l2, x)
-            di, dj = 1, 0
+        x1 = l1[i][0] if i < len(l1) else float('inf')
+        x2 = l2[j][0] if j < len(l2) else float('inf')
+        x = min(x1, x2)
 
-            if f1 != f2:
-                merged.append(
-                    l1[i] if f1 > f2
-                    else break_point.new(x, f2, s2))
-            else:
-                merged.append(l1[i] if s1 > s2 else break_point.new(x, f2, s2))
-
-        elif l2[j][0] < l1[i][0]:
-            x = l2[j][0]
-            f1, f2 = _f(l1, x), l2[j][1]
-            s1, s2 = _s(l1, x), l2[j][2]
-            di, dj = 0, 1
-
-            if f1 != f2:
-                merged.append(break_point.new(x, f1, s1) if f1 > f2 else l2[j])
-            else:
-                # Append break point with bigger slope
-                merged.append(l2[j] if s2 > s1 else break_point.new(x, f1, s1))
+        f1, s1 = (l1[i][1], l1[i][2]) if x1 == x else (_f(l1, x), _s(l1, x))
+        f2, s2 = (l2[j][1], l2[j][2]) if x2 == x else (_f(l2, x), _s(l2, x))
 
+        if f1 > f2 or (f1 == f2 and s1 >= s2):
+            f, s, f_low, s_low = f1, s1, f2, s2
         else:
-            x = l1[i][0]
-            f1, f2 = l1[i][1], l2[j][1]
-            s1, s2 = l1[i][2], l2[j][2]
-            di, dj = 1, 1
+            f, s, f_low, s_low = f2, s2, f1, s1
 
-            if f1 != f2:
-                merged.append(l1[i] if f1 > f2 else l2[j])
-            else:
-                # Append break point with bigger slope
-                merged.append(l1[i] if l1[i][2] > l2[j][2] else l2[j])
-
-        df = f2 - f1
+        merged.append(l1[i] if x1 == x and (f, s) == (f1, s1) else
+                      l2[j] if x2 == x and (f, s) == (f2, s2) else
+                      break_point.new(x, f, s))
 
-        if df * df_old < 0:  # Found intersection
-            xnew = x_old + df_old
-            fnew = f_old + s_old * df_old
+        i += x1 == x
+        j += x2 == x
 
-            if 0 < xnew < M and fnew < M:
-                merged.insert(-1, break_point.new(xnew, fnew, s_old))
+        x_next = min(l1[i][0] if i < len(l1) else float('inf'),
+                     l2[j][0] if j < len(l2) else float('inf'))
 
-        i = i + di
-        j = j + dj
+        # Found intersection
+        if s_low > s and f_low > float('-inf'):
+            xnew = x + (f - f_low) / (s_low - s)
 
-        df_old = df
-        x_old = merged[-1][0]
-        f_old = merged[-1][1]
-        s_old = merged[-1][2]
+            if xnew < x_next and xnew < M:
+                merged.append(break_point.new(xnew, f_low + s_low * (xnew - x), s_low))
 
     _remove_redundant_break_points(merged)
 
@@ -422,3 +397,140 @@ def mim_reachable_charge(l):
         if bp[1] >= 0:
             return bp[0]
     return float('inf')
+
+
+def dominates(l1, l2):
+    """
+    Checking if a function is point-wise greater than or equal to another
+
+    Between two break points of either function both are linear, so
+    comparing their values and their left limits at all break points
+    is enough
+
+    Args:
+    l1: First list of break points
+    l2: Second list of break points (with the same domain)
+
+    Returns:
+    True if l1(x) >= l2(x) for all x in the domain
+    """
+    xs = sorted(set([bp[0] for bp in l1] + [bp[0] for bp in l2]))
+
+    for x_prev, x in zip(xs[:-1], xs[1:]):
+        if _f(l1, x_prev) < _f(l2, x_prev) or _f_left(l1, x) < _f_left(l2, x):
+            return False
+
+    return _f(l1, xs[-1]) >= _f(l2, xs[-1])
+
+
+def _f_left(l, charge):
+    """
+    Left limit of a function (list of break points) at charge
+    """
+    for i in range(len(l) - 1):
+        if l[i][0] < charge <= l[i + 1][0]:
+            return l[i][1] + l[i][2] * (charge - l[i][0])
+
+    return float('-inf')
+
+
+def simplify(l, max_break_points=None, eps=None):
+    """
+    Lower-approximating a function (list of break points) by a function
+    with fewer break points
+
+    Adjacent segments are greedily replaced by a single segment (slope 0
+    or 1) lying below the original function, so the reachable charge is
+    never overestimated. Merging stops once the function has at most
+    max_break_points break points and no further merge stays within eps.
+    The -inf span of a function which needs a minimum charge is never
+    merged with a finite one, so such a function keeps its reach break
+    point and at least 3 break points whatever max_break_points is.
+
+    Args:
+    l: A sorted list of break points (l[-1][0] = M)
+    max_break_points: Maximum number of break points to keep (at least 2,
+        None for no limit)
+    eps: Maximum allowed error (in SoC) of a merged segment, measured
+        against l over the span it replaces
+
+    Returns:
+    (simplified list of break points, maximum error introduced)
+    """
+    if max_break_points is not None and max_break_points < 2:
+        raise ValueError('A function needs at least 2 break points', max_break_points)
+
+    if max_break_points is None and eps is None:
+        return l, 0
+
+    max_break_points = max_break_points if max_break_points is not None else len(l)
+    eps = eps if eps is not None else -1
+
+    if len(l) <= 2:
+        return l, 0
+
+    # Spans of segments [start, end) in l, each approximated by one segment
+    spans = [[i, i + 1] + list(_lower_segment(l, i, i + 1)) for i in range(len(l) - 1)]
+    costs = [_lower_segment(l, spans[p][0], spans[p + 1][1])
+             for p in range(len(spans) - 1)]
+
+    while costs:
+        # Merges across the -inf / finite boundary have an infinite error
+        mergeable = [q for q in range(len(costs)) if costs[q][2] < float('inf')]
+        if not mergeable:
+            break
+
+        p = min(mergeable, key=lambda q: costs[q][2])
+        err = costs[p][2]
+
+        if len(spans) + 1 <= max_break_points and not err <= eps:
+            break
+
+        spans[p] = [spans[p][0], spans[p + 1][1]] + list(costs[p])
+        del spans[p + 1]
+        del costs[p]
+
+        if p > 0:
+            costs[p - 1] = _lower_segment(l, spans[p - 1][0], spans[p][1])
+        if p < len(costs):
+            costs[p] = _lower_segment(l, spans[p][0], spans[p + 1][1])
+
+    simplified = [break_point.new(l[s[0]][0], s[2], s[3]) for s in spans]
+    simplified.append(l[-1])
+
+    return simplified, max([s[4] for s in spans])
+
+
+def _lower_segment(l, start, end):
+    """
+    Finding the best segment lying below segments start, ..., end - 1 of l
+
+    Args:
+    l: A sorted list of break points
+    start: Index of the first segment
+    end: Index of the break point ending the last segment
+
+    Returns:
+    (final charge, slope, error) of the segment starting at l[start][0]
+    """
+    x_a = l[start][0]
+    segments = [(l[i][0], l[i + 1][0], l[i][1], l[i][2]) for i in range(start, end)]
+
+    if all(f == float('-inf') for _, _, f, _ in segments):
+        return float('-inf'), 0, 0
+    if any(f == float('-inf') for _, _, f, _ in segments):
+        return float('-inf'), 0, float('inf')
+
+    # Slope zero: the minimum of the function over the span
+    v0 = min(f for _, _, f, _ in segments)
+    e0 = max(f + s * (x2 - x1) - v0 for x1, x2, f, s in segments)
+
+    # Slope one: the largest line with unit slope staying below the function
+    v1 = min(f - (x2 - x_a) if s == 0 else f - (x1 - x_a)
+             for x1, x2, f, s in segments)
+    e1 = max(f - (x1 - x_a) - v1 for x1, x2, f, s in segments)
+
+    if v1 < 0 or e0 <= e1:
+        return v0, 0, e0
+    else:
+        return v1, 1, e1
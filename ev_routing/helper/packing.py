@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def pack(matrix):
+    """
+    Packing a matrix of functions (lists of break points) into flat arrays
+
+    :param matrix: n x m matrix (list of lists) of lists of break points
+    :return: offsets (int64, n * m + 1) and break_points (float64, (N, 3)),
+        the break points of cell (i, j) are
+        break_points[offsets[i * m + j]:offsets[i * m + j + 1]]
+    """
+    cells = [l for row in matrix for l in row]
+
+    offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+    np.cumsum([len(l) for l in cells], out=offsets[1:])
+
+    break_points = np.array(
+        [bp for l in cells for bp in l], dtype=np.float64).reshape(-1, 3)
+
+    return offsets, break_points
+
+
+def unpack(offsets, break_points, shape):
+    """
+    Unpacking flat arrays into a matrix of functions
+
+    :param offsets: Offsets as returned by pack
+    :param break_points: Break points as returned by pack
+    :param shape: (n, m)
+    :return: n x m matrix (list of lists) of lists of break points
+    """
+    n, m = shape
+    offsets = offsets.tolist()
+    bps = [(x, f, int(s)) for x, f, s in break_points.tolist()]
+
+    return [
+        [bps[offsets[i * m + j]:offsets[i * m + j + 1]] for j in range(m)]
+        for i in range(n)
+    ]
+
+
+def cell(offsets, break_points, m, i, j):
+    """
+    Break points of a single cell (i, j) of a packed n x m matrix
+
+    :return: (N, 3) array
+    """
+    k = i * m + j
+    return break_points[offsets[k]:offsets[k + 1]]
@@ -0,0 +1,152 @@
+import numpy as np
+from . import break_point
+from . import break_points_list
+
+
+def charges(M, G):
+    """
+    G evenly spaced initial charges in [0, M]
+
+    Args:
+    M: Maximum battery capacity
+    G: Number of samples
+
+    Returns:
+    NumPy array of initial charges
+    """
+    return np.linspace(0, M, G)
+
+
+def evaluate(l, xs):
+    """
+    Evaluating a function (list of break points) at many charges at once
+
+    Args:
+    l: Sorted list of break points
+    xs: NumPy array of initial charges
+
+    Returns:
+    NumPy array of final charges (-inf where unreachable)
+    """
+    IC = np.array([bp[0] for bp in l], dtype=float)
+    FC = np.array([bp[1] for bp in l], dtype=float)
+    S = np.array([bp[2] for bp in l], dtype=float)
+
+    xs = np.asarray(xs, dtype=float)
+    idx = np.clip(np.searchsorted(IC, xs, side='right') - 1, 0, len(l) - 1)
+
+    with np.errstate(invalid='ignore'):
+        y = FC[idx] + S[idx] * (xs - IC[idx])
+
+    y[~(xs >= IC[0])] = float('-inf')
+
+    return y
+
+
+def from_break_points(l, M, G):
+    """
+    Sampling a function (list of break points) on the charge grid
+
+    Args:
+    l: Sorted list of break points
+    M: Maximum battery capacity
+    G: Number of samples
+
+    Returns:
+    NumPy array of length G
+    """
+    return evaluate(l, charges(M, G))
+
+
+def from_matrix(matrix, M, G):
+    """
+    Sampling a matrix of functions on the charge grid
+
+    Args:
+    matrix: n x n matrix (list of lists) of lists of break points
+    M: Maximum battery capacity
+    G: Number of samples
+
+    Returns:
+    NumPy array of shape (n, n, G)
+    """
+    n = len(matrix)
+    xs = charges(M, G)
+    grid = np.empty((n, n, G))
+
+    for i in range(n):
+        for j in range(n):
+            grid[i, j] = evaluate(matrix[i][j], xs)
+
+    return grid
+
+
+def link(y_ik, y_kj, M):
+    """
+    Linking a sampled function with one or many sampled functions
+
+    The final charges of y_ik are looked up in y_kj by linear interpolation
+    between neighbouring samples
+
+    Args:
+    y_ik: Sampled function between nodes i and k, shape (G,)
+    y_kj: Sampled function(s) between nodes k and j, shape (..., G)
+    M: Maximum battery capacity
+
+    Returns:
+    Sampled function(s) between nodes i and j, shape of y_kj
+    """
+    G = y_kj.shape[-1]
+    reachable = y_ik >= 0
+
+    p = np.where(reachable, y_ik, 0) * ((G - 1) / M)
+    lo = np.clip(np.floor(p).astype(int), 0, G - 2)
+    frac = p - lo
+
+    y_lo = y_kj[..., lo]
+    y_hi = y_kj[..., lo + 1]
+
+    with np.errstate(invalid='ignore'):
+        y = np.where(frac == 0, y_lo, y_lo + frac * (y_hi - y_lo))
+
+    y[np.isnan(y)] = float('-inf')
+    y[..., ~reachable] = float('-inf')
+
+    return y
+
+
+def merge(y1, y2):
+    """
+    Point-wise maximum of sampled functions
+    """
+    return np.maximum(y1, y2)
+
+
+def to_break_points(y, M):
+    """
+    Converting a sampled function back into a list of break points
+
+    Each interval between two samples becomes a segment of slope 1 if the
+    samples lie on a line of slope 1, otherwise a segment of slope 0
+    starting at the lower sample
+
+    Args:
+    y: Sampled function, shape (G,)
+    M: Maximum battery capacity
+
+    Returns:
+    A list of break points
+    """
+    xs = charges(M, len(y))
+    dx = xs[1] - xs[0]
+
+    l = []
+    for g in range(len(y) - 1):
+        slope = 1 if np.isfinite(y[g]) and np.isclose(y[g + 1] - y[g], dx) else 0
+        l.append(break_point.new(float(xs[g]), float(y[g]), slope))
+
+    l.append(break_point.new(float(M), float(y[-1]), 0))
+
+    break_points_list._remove_redundant_break_points(l)
+
+    return l
@@ -0,0 +1,128 @@
+import functools
+import time
+from contextlib import contextmanager, nullcontext
+from . import break_points_list
+
+
+class Stats:
+    """Counters and timings of a search"""
+
+    def __init__(self):
+        """
+        Searches only fill a Stats if they are asked to (stats=True),
+        otherwise nothing is counted
+        """
+        # Queue pushes and pops (for the sweeps of ContractionHierarchy,
+        # pops are the nodes scanned)
+        self.pushes = 0
+        self.pops = 0
+        # Nodes (or cells) the search found a charge or function for
+        self.reached = 0
+        self.relaxations = 0
+        self.prunes = 0
+        self.links = 0
+        self.merges = 0
+
+        # break_points[vid]: Number of break points of the final function
+        # of vid (profile searches only), keys are (i, j) for matrices
+        self.break_points = {}
+
+        # times[phase]: Seconds spent in a phase, 'total' is the whole call
+        self.times = {}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Adding the time spent in the context to times[name]
+        """
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0) + time.perf_counter() - start
+
+    def timed(self, name, func, counter=None):
+        """
+        func adding its time to times[name] and, if counter is given,
+        its calls to that attribute
+        """
+        times = self.times
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if counter:
+                setattr(self, counter, getattr(self, counter) + 1)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                times[name] = times.get(name, 0) + time.perf_counter() - start
+
+        return wrapper
+
+    def as_dict(self):
+        """
+        :return: Dictionary of all counters and timings
+        """
+        return {
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'reached': self.reached,
+            'relaxations': self.relaxations,
+            'prunes': self.prunes,
+            'links': self.links,
+            'merges': self.merges,
+            'break_points': dict(self.break_points),
+            'times': dict(self.times),
+        }
+
+    def __repr__(self):
+        return 'Stats(%s)' % ', '.join(
+            '%s=%r' % (k, v) for k, v in self.as_dict().items() if k != 'break_points')
+
+
+def with_stats(search):
+    """
+    Decorator of a search taking a stats argument (Stats or None)
+
+    Called with stats=True, the search returns (result, Stats), otherwise
+    it returns its result and nothing is counted
+    """
+    @functools.wraps(search)
+    def wrapper(*args, stats=False, **kwargs):
+        if not stats:
+            return search(*args, stats=None, **kwargs)
+
+        stats = Stats()
+        with stats.phase('total'):
+            result = search(*args, stats=stats, **kwargs)
+
+        return result, stats
+
+    return wrapper
+
+
+def primitives(stats):
+    """
+    link, sort and merge of helper.break_points_list, timed as phases of
+    the same names and counted (links, merges) if stats is not None
+
+    Searches take them once per call, so nothing is added without stats
+    """
+    if stats is None:
+        return break_points_list.link, break_points_list.sort, break_points_list.merge
+
+    return (
+        stats.timed('link', break_points_list.link, 'links'),
+        stats.timed('sort', break_points_list.sort),
+        stats.timed('merge', break_points_list.merge, 'merges'),
+    )
+
+
+def phase(stats, name):
+    """
+    stats.phase(name), or a context doing nothing if stats is None
+    """
+    return stats.phase(name) if stats is not None else nullcontext()
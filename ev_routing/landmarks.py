@@ -0,0 +1,151 @@
+import numpy as np
+from scipy.sparse.csgraph import johnson, shortest_path
+
+
+class Landmarks:
+    """ALT lower bounds on the energy consumption between nodes"""
+
+    def __init__(self, evr, k=4, landmarks=None):
+        """
+        Precomputing the consumptions from and to a few landmarks
+
+        Landmarks are picked greedily, each one as far as possible from the
+        ones already picked. Consumptions are shortest path costs (ignoring
+        the battery capacity, which can only increase the consumption),
+        computed with Johnson's algorithm as costs can be negative
+
+        :param evr: EVRouting instance
+        :param k: Number of landmarks
+        :param landmarks: Ids of the landmarks (if None, they are picked)
+        """
+        self.vid = evr.vid
+        self.index = {vid: i for i, vid in enumerate(self.vid)}
+
+        adjacency = evr.adjacency()
+
+        if landmarks is None:
+            landmarks = self._pick(adjacency, k)
+
+        self.landmarks = list(landmarks)
+        idx = [self.index[vid] for vid in self.landmarks]
+
+        # from_landmark[l, v] = d(l, v), to_landmark[l, v] = d(v, l)
+        self.from_landmark = johnson(adjacency, indices=idx)
+        self.to_landmark = johnson(adjacency.T.tocsr(), indices=idx)
+
+        self.slopes = self._elevation_slopes(evr)
+        self.elev = np.array([evr.v[vid]['elev'] for vid in self.vid])
+
+    def lower_bounds(self, tid):
+        """
+        Lower bounds on the consumption from every node to tid
+
+        The landmark bounds d(l, t) - d(l, v) and d(v, l) - d(t, l) are
+        combined with the elevation bounds slope * (h_t - h_v), all of them
+        are consistent potentials and so is their maximum
+
+        :param tid: Id of the target node
+        :return: Array indexed like evr.vid (inf: tid is not reachable)
+        """
+        t = self.index[tid]
+
+        with np.errstate(invalid='ignore'):
+            forward = self.from_landmark[:, t:t + 1] - self.from_landmark
+            backward = self.to_landmark - self.to_landmark[:, t:t + 1]
+
+        # inf: t is not reachable from v, inf - inf: nothing is known
+        bounds = np.concatenate([forward, backward])
+        bounds[np.isnan(bounds)] = -np.inf
+        bounds = bounds.max(axis=0)
+
+        for slope in self.slopes:
+            bounds = np.maximum(bounds, slope * (self.elev[t] - self.elev))
+
+        bounds[t] = 0
+
+        return bounds
+
+    def lower_bound(self, sid, tid):
+        """
+        Lower bound on the consumption from sid to tid (see lower_bounds)
+        for a single pair
+
+        :return: Bound, inf if tid is not reachable
+        """
+        if sid == tid:
+            return 0
+
+        s, t = self.index[sid], self.index[tid]
+
+        with np.errstate(invalid='ignore'):
+            bounds = np.concatenate([
+                self.from_landmark[:, t] - self.from_landmark[:, s],
+                self.to_landmark[:, s] - self.to_landmark[:, t],
+            ])
+
+        bound = bounds[~np.isnan(bounds)].max(initial=-np.inf)
+
+        for slope in self.slopes:
+            bound = max(bound, slope * (self.elev[t] - self.elev[s]))
+
+        return float(bound)
+
+    def potential(self, tids):
+        """
+        :param tids: Ids of the target nodes
+        :return: Dictionary {vid: lower bound on the consumption from vid
+            to the closest target}
+        """
+        bounds = np.min([self.lower_bounds(tid) for tid in tids], axis=0)
+
+        return dict(zip(self.vid, bounds.tolist()))
+
+    def _pick(self, adjacency, k):
+        """
+        Picking k landmarks, the first one is the farthest node (in hops)
+        from the first node and each next one maximises the number of hops
+        to the closest landmark picked so far
+        """
+        n = adjacency.shape[0]
+        edges = adjacency.copy()
+        edges.data = np.ones_like(edges.data)
+
+        def hops(vid):
+            h = shortest_path(edges, method='D', indices=[vid])[0]
+            # Unreachable nodes are the farthest
+            return np.where(np.isinf(h), n, h)
+
+        picked = [int(np.argmax(hops(0)))]
+        closest = hops(picked[0])
+
+        while len(picked) < min(k, n):
+            closest[picked] = -1
+            picked.append(int(np.argmax(closest)))
+            closest = np.minimum(closest, hops(picked[-1]))
+
+        return [self.vid[i] for i in picked]
+
+    def _elevation_slopes(self, evr):
+        """
+        Slopes beta with cost >= beta * (h_v - h_u) for all edges u -> v
+
+        Such betas form an interval, its ends are returned
+
+        :return: List of (at most two) slopes, empty if there is none
+        """
+        up, down = [], []
+
+        for e in evr.e.values():
+            dh = evr.v[e['v']]['elev'] - evr.v[e['u']]['elev']
+
+            if dh > 0:
+                up.append(e['cost'] / dh)
+            elif dh < 0:
+                down.append(e['cost'] / dh)
+            elif e['cost'] < 0:
+                return []
+
+        if up and down and max(down) > min(up):
+            return []
+
+        return ([min(up)] if up else []) + ([max(down)] if down else [])
@@ -1,10 +1,14 @@
+import numpy as np
+from scipy import sparse
 from .map.map_api import MapAPI
+from .landmarks import Landmarks
+from .feasibility import FeasibilityOracle
 
 
 class EVRouting:
     """Electrical Vehicles (EV) Routing Class"""
 
-    def __init__(self, area, testing=False):
+    def __init__(self, area, testing=False, scc=None, graph=None, profile=None):
         """
         Initializing EVRouting by:
         - loading nodes and edges based on a given region
@@ -12,13 +16,22 @@ class EVRouting:
 
         Keyword arguments:
         area -- Array of 4 Numbers (bottom left lat/lon, upper right lat/lon)
+        scc -- If given, strongly connected components are computed after
+            loading, 'largest' keeps only the largest one, 'tag' tags them
+            (see MapAPI.prune_components)
+        graph -- If given, (vertices, edges) used instead of loading the
+            area, e.g. from map.synthetic (area may then be None)
+        profile -- If given, VehicleProfile of the edge costs
+            (see MapAPI.use_profile and set_profile)
 
         Example
         >>> from ev_routing import EVRouting
         >>> evr = EVRouting([ 52.50, 13.37, 52.53, 13.40 ])
+        >>> from ev_routing.map import synthetic
+        >>> evr = EVRouting(None, graph=synthetic.grid(10, 10))
         """
 
-        self.map = MapAPI(area, testing=testing)
+        self.map = MapAPI(area, testing=testing, scc=scc, graph=graph, profile=profile)
         self.v = self.map.v
         self.e = self.map.e
 
@@ -26,6 +39,119 @@ class EVRouting:
 
         self.vid = [v['id'] for v in self.v.values()]
 
+        self._adjacency = None
+        self.landmarks = None
+        self.feasibility = None
+
+    def set_landmarks(self, k=4, landmarks=None):
+        """
+        Precomputing ALT lower bounds (see landmarks.Landmarks), which are
+        then used by the searches to prune and guide their queues
+
+        Keyword arguments:
+        k -- Number of landmarks
+        landmarks -- Ids of the landmarks (if None, they are picked)
+        """
+        self.landmarks = Landmarks(self, k, landmarks)
+
+    def set_feasibility(self, k=4):
+        """
+        Precomputing a feasibility oracle (see feasibility.FeasibilityOracle),
+        which the searches ask before they run
+
+        Keyword arguments:
+        k -- Number of landmarks (if none have been set)
+        """
+        self.feasibility = FeasibilityOracle(self, k)
+
+    def update_edge(self, eid, cost):
+        """
+        Changing the cost of one edge (see update_edges)
+        """
+        return self.update_edges({eid: cost})
+
+    def update_edges(self, costs):
+        """
+        Changing the costs of edges (e.g. road closures or construction)
+
+        The changes are recorded by the map (see MapAPI.update_edges), the
+        adjacency matrix is dropped and landmarks are recomputed for the
+        same landmark nodes. Structures of subclasses derived from the
+        costs are repaired in _edges_updated. The feasibility oracle is
+        recomputed as well
+
+        Keyword arguments:
+        costs -- Dictionary {edge id: new cost}
+
+        Return:
+        The result of _edges_updated (e.g. the recomputed cells)
+        """
+        self.map.update_edges(costs)
+
+        return self._costs_changed(list(costs))
+
+    def set_profile(self, profile):
+        """
+        Routing for another vehicle: the edge costs are switched to those
+        of its profile (see MapAPI.use_profile) and the derived structures
+        are repaired as in update_edges, without reloading the map
+
+        Keyword arguments:
+        profile -- VehicleProfile (if None, the costs the map was loaded with)
+
+        Return:
+        The result of _edges_updated
+        """
+        return self._costs_changed(self.map.use_profile(profile))
+
+    def _costs_changed(self, eids):
+        """
+        Dropping or recomputing what depends on the costs of edges eids
+        """
+        self._adjacency = None
+
+        if self.landmarks is not None:
+            self.set_landmarks(landmarks=self.landmarks.landmarks)
+
+        if self.feasibility is not None:
+            self.set_feasibility(len(self.feasibility.landmarks.landmarks))
+
+        return self._edges_updated(eids)
+
+    def _edges_updated(self, eids):
+        """
+        Repairing the structures derived from the costs of edges eids
+        (nothing is derived here)
+        """
+        return None
+
+    def adjacency(self):
+        """
+        Sparse adjacency matrix of the edge costs (computed once)
+
+        Return:
+        scipy.sparse.csr_matrix, entry (i, j) is the minimum cost of the
+        edges from self.vid[i] to self.vid[j] (loops and edges with an
+        infinite cost are dropped)
+        """
+        if self._adjacency is None:
+            index = {vid: i for i, vid in enumerate(self.vid)}
+            costs = {}
+
+            for e in self.e.values():
+                i, j = index[e['u']], index[e['v']]
+                if i != j and e['cost'] < float('inf'):
+                    costs[(i, j)] = min(costs.get((i, j), float('inf')), e['cost'])
+
+            rows = np.array([i for i, _ in costs], dtype=np.int64)
+            cols = np.array([j for _, j in costs], dtype=np.int64)
+            data = np.array(list(costs.values()), dtype=np.float64)
+
+            self._adjacency = sparse.csr_matrix(
+                (data, (rows, cols)), shape=(len(self.vid), len(self.vid)))
+
+        return self._adjacency
+
     def check_alpha_true(self):
         num_edges = 0
         num_pos_cost = 0
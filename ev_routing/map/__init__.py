@@ -1,2 +1,3 @@
 from .map_api import MapAPI
 from .srtm3_api import SRTM3API
+from .vehicle_profile import VehicleProfile
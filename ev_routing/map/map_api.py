@@ -1,14 +1,28 @@
 from .srtm3_api import SRTM3API
+from . import scc as scc_module
 
 import overpy
+import numpy as np
 
 from math import sin, cos, atan2, sqrt
+from collections import Counter
 import pickle
 import os
 
 api = overpy.Overpass()
 
 
+def lengths(lat_u, lon_u, lat_v, lon_v):
+    """
+    Lengths of edges from arrays of coordinates (same formula as
+    MapAPI._cost)
+    """
+    a = (np.sin((lat_v - lat_u) / 2) ** 2
+         + np.cos(lat_u) * np.cos(lat_u) * np.sin((lon_v - lon_u) / 2) ** 2)
+
+    return 6.378e6 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
 class MapAPI:
     OSM_STREET_TAGS = [
         'motorway', 'motorway_link', 'motorway_junction',
@@ -27,13 +41,17 @@ class MapAPI:
 
     MAPAPI_DIR = os.environ['HOME'] + '/.map_api'
 
-    def __init__(self, area=[], testing=False):
+    def __init__(self, area=[], testing=False, scc=None, graph=None, profile=None):
         """
         Initializing OpenStreetMapAPI object
 
         Keyword arguments:
         area -- Array of 4 Numbers (bottom left lat/lon, upper right lat/lon)
         testing -- returns the test graph
+        scc -- If given, mode of prune_components run after loading
+        graph -- If given, (vertices, edges) used instead of loading a map,
+            e.g. from map.synthetic (area defaults to their bounding box)
+        profile -- If given, VehicleProfile of the edge costs (see use_profile)
 
 
         Example
@@ -42,8 +60,26 @@ class MapAPI:
         self.v = {}
         self.e = {}
 
+        # Edge arrays and costs per vehicle profile (see edge_arrays, costs)
+        self._edge_arrays = None
+        self._costs = {}
+
+        # Original costs of the edges changed by update_edge
+        self.changed_edges = {}
+
+        # Vehicle profile of the edge costs (None: the costs as loaded)
+        self.profile = None
+        self._loaded_costs = None
+
+        # Components reachable from each component (see prune_components)
+        self.component_reaches = None
+
         if testing:
             area = [52.51, 13.373, 52.52, 13.401]
+        elif graph is not None and not area:
+            lat = [u['lat'] for u in graph[0].values()]
+            lon = [u['lon'] for u in graph[0].values()]
+            area = [min(lat), min(lon), max(lat), max(lon)]
 
         # Create map_api config directory
         if 'HOME' not in os.environ:
@@ -63,8 +99,21 @@ class MapAPI:
         if testing:
             self.v = self.testing_vertices(area)
             self.e = self.testing_edges()
-            return
+        elif graph is not None:
+            self.v, self.e = graph
+        else:
+            self._load(area)
+
+        if scc:
+            self.prune_components(scc)
 
+        if profile is not None:
+            self.use_profile(profile)
+
+    def _load(self, area):
+        """
+        Loading vertices and edges from disk, or downloading them
+        """
         # Loading/downloadin elevations
         SRTM = SRTM3API(area)
 
@@ -131,6 +180,173 @@ class MapAPI:
 
         return None
 
+    def prune_components(self, mode='largest'):
+        """
+        Computing the strongly connected components of the graph, closed
+        edges (infinite cost) are left out
+
+        The vertices and edges are changed in place, but engines copy the
+        vertex ids and derive structures from them when they are built, so
+        pruning belongs before (EVRouting takes scc= for this)
+
+        Keyword arguments:
+        mode -- 'largest': Keeping only the vertices and edges of the
+            largest component
+            'tag': Storing the component of each vertex in
+            v['component'], reachable() then answers from the components
+            (they are recomputed by update_edges)
+        """
+        component = scc_module.strongly_connected_components(self.v, self.e, scc_module.is_open)
+
+        if mode == 'largest':
+            sizes = Counter(component.values())
+            largest = max(sizes, key=lambda c: (sizes[c], -c)) if sizes else None
+
+            for vid in [vid for vid in self.v if component[vid] != largest]:
+                del self.v[vid]
+            for eid in [eid for eid, e in self.e.items()
+                        if e['u'] not in self.v or e['v'] not in self.v]:
+                del self.e[eid]
+
+            for u in self.v.values():
+                u['incoming'] = [eid for eid in u['incoming'] if eid in self.e]
+                u['outgoing'] = [eid for eid in u['outgoing'] if eid in self.e]
+
+            self.component_reaches = None
+        elif mode == 'tag':
+            self._tag_components(component)
+        else:
+            raise ValueError('Unknown mode', mode)
+
+        self._edge_arrays = None
+        self._costs = {}
+
+    def _tag_components(self, component):
+        for vid, c in component.items():
+            self.v[vid]['component'] = c
+
+        self.component_reaches = scc_module.reaches(component, self.e, scc_module.is_open)
+
+    def reachable(self, i, j):
+        """
+        Check if node j may be reachable from node i
+
+        Return:
+        False if components have been tagged and no path leads from i to j
+        """
+        if self.component_reaches is None:
+            return True
+
+        return bool(self.component_reaches[self.v[i]['component']] >> self.v[j]['component'] & 1)
+
+    def update_edge(self, eid, cost):
+        """
+        Changing the cost of an edge (see update_edges)
+        """
+        self.update_edges({eid: cost})
+
+    def update_edges(self, costs):
+        """
+        Changing the costs of edges (e.g. float('inf') for closed roads)
+
+        The original costs are recorded in self.changed_edges and tagged
+        components (see prune_components) are recomputed. Costs of
+        vehicle profiles (see costs) are derived from the geometry and are
+        not affected
+
+        Args:
+        costs: Dictionary {edge id: new cost}
+        """
+        for eid, cost in costs.items():
+            self.changed_edges.setdefault(eid, self.e[eid]['cost'])
+            self.e[eid]['cost'] = cost
+
+        if self.component_reaches is not None:
+            self._tag_components(
+                scc_module.strongly_connected_components(self.v, self.e, scc_module.is_open))
+
+    def use_profile(self, profile):
+        """
+        Switching the costs of the edges (self.e) to those of a vehicle
+        profile, so every engine reading them routes for that vehicle
+
+        Edges changed by update_edge keep their new costs, their original
+        costs become those of the profile
+
+        Args:
+        profile: VehicleProfile (if None, the costs the edges were loaded with)
+
+        Return:
+        Ids of the edges whose cost changed
+        """
+        if self._loaded_costs is None:
+            self._loaded_costs = {eid: e['cost'] for eid, e in self.e.items()}
+            for eid, cost in self.changed_edges.items():
+                self._loaded_costs[eid] = cost
+
+        if profile is None:
+            costs = self._loaded_costs
+        else:
+            costs = dict(zip(self.edge_arrays()['id'].tolist(), self.costs(profile).tolist()))
+
+        changed = []
+
+        for eid, e in self.e.items():
+            if eid in self.changed_edges:
+                self.changed_edges[eid] = costs[eid]
+            elif e['cost'] != costs[eid]:
+                e['cost'] = costs[eid]
+                changed.append(eid)
+
+        self.profile = profile
+
+        return changed
+
+    def edge_arrays(self):
+        """
+        Edge ids, lengths and elevation deltas as arrays (computed once)
+
+        Return:
+        Dictionary with 'id', 'length' and 'dh' (h_v - h_u) arrays
+        """
+        if self._edge_arrays is None:
+            ids = np.array(list(self.e), dtype=np.int64)
+            u = [self.v[self.e[eid]['u']] for eid in self.e]
+            v = [self.v[self.e[eid]['v']] for eid in self.e]
+
+            lat_u = np.array([x['lat'] for x in u], dtype=np.float64)
+            lon_u = np.array([x['lon'] for x in u], dtype=np.float64)
+            lat_v = np.array([x['lat'] for x in v], dtype=np.float64)
+            lon_v = np.array([x['lon'] for x in v], dtype=np.float64)
+
+            length = lengths(lat_u, lon_u, lat_v, lon_v)
+            dh = np.array([y['elev'] - x['elev'] for x, y in zip(u, v)], dtype=np.float64)
+
+            self._edge_arrays = {'id': ids, 'length': length, 'dh': dh}
+
+        return self._edge_arrays
+
+    def costs(self, profile):
+        """
+        Costs of all edges for a vehicle profile, computed once per profile
+
+        Several profiles share the same vertices, edges and edge arrays,
+        the costs stored in the edges (self.e) are left untouched
+
+        Args:
+        profile: VehicleProfile
+
+        Return:
+        Array of costs, aligned with edge_arrays()['id']
+        """
+        key = profile.key()
+
+        if key not in self._costs:
+            arrays = self.edge_arrays()
+            self._costs[key] = profile.costs(arrays['length'], arrays['dh'])
+
+        return self._costs[key]
+
     def _new_vertex(self, id, lat, lon):
         """Generating and returning a new vertex object"""
         return {
@@ -0,0 +1,106 @@
+def strongly_connected_components(v, e, usable=None):
+    """
+    Tarjan's algorithm with an explicit stack instead of recursion
+
+    Keyword arguments:
+    v -- Vertices (see MapAPI)
+    e -- Edges (see MapAPI)
+    usable -- If given, function of an edge, edges for which it is False
+        are left out (e.g. is_open, for closed roads)
+
+    Return:
+    Dictionary {vertex id: component}, components are numbered in reverse
+    topological order, i.e. a component only reaches smaller numbers
+    """
+    index, low = {}, {}
+    stack, on_stack = [], set()
+    component = {}
+    n_components = 0
+
+    for root in v:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(v[root]['outgoing']))]
+
+        while work:
+            uid, edges = work[-1]
+
+            for eid in edges:
+                if usable is not None and not usable(e[eid]):
+                    continue
+
+                wid = e[eid]['v']
+
+                if wid not in index:
+                    index[wid] = low[wid] = len(index)
+                    stack.append(wid)
+                    on_stack.add(wid)
+                    work.append((wid, iter(v[wid]['outgoing'])))
+                    break
+
+                if wid in on_stack:
+                    low[uid] = min(low[uid], index[wid])
+            else:
+                # All edges of uid are done
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[uid])
+
+                if low[uid] == index[uid]:
+                    while True:
+                        wid = stack.pop()
+                        on_stack.discard(wid)
+                        component[wid] = n_components
+                        if wid == uid:
+                            break
+
+                    n_components += 1
+
+    return component
+
+
+def reaches(component, e, usable=None):
+    """
+    Bitsets (ints) of the components reachable from each component
+
+    Keyword arguments:
+    component -- Dictionary {vertex id: component}
+        (see strongly_connected_components)
+    e -- Edges (see MapAPI)
+    usable -- see strongly_connected_components
+
+    Return:
+    List indexed by component
+    """
+    n = len(set(component.values()))
+    succ = [set() for _ in range(n)]
+
+    for edge in e.values():
+        if usable is not None and not usable(edge):
+            continue
+
+        a, b = component[edge['u']], component[edge['v']]
+        if a != b:
+            succ[a].add(b)
+
+    # Successors have smaller numbers, so they are complete
+    result = []
+    for c in range(n):
+        bits = 1 << c
+        for d in succ[c]:
+            bits |= result[d]
+        result.append(bits)
+
+    return result
+
+
+def is_open(edge):
+    """
+    False for closed edges (infinite cost, see MapAPI.update_edge)
+    """
+    return edge['cost'] < float('inf')
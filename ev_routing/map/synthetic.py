@@ -0,0 +1,231 @@
+"""
+Synthetic road-like graphs for offline tests and scaling measurements
+
+Every generator returns (vertices, edges) in the format of MapAPI, which
+can be passed as graph to MapAPI, EVRouting and its subclasses
+
+>>> from ev_routing.map import synthetic
+>>> from ev_routing.dijkstra import Dijkstra
+>>> d = Dijkstra(None, graph=synthetic.grid(100, 100))
+
+Positions are generated in meters and stored as coordinates in the units
+MapAPI._cost reads them (radians) around (0, 0), so edge lengths are the
+distances in meters. Costs follow the energy model of MapAPI._cost (see
+VehicleProfile), steep downhill edges have negative costs
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import minimum_spanning_tree
+from .map_api import lengths
+from .vehicle_profile import VehicleProfile
+
+# Earth radius of MapAPI._cost
+R = 6.378e6
+
+
+def grid(rows, cols, spacing=100, missing=0, seed=0, relief=None, profile=None):
+    """
+    Grid of streets with slightly jittered crossings
+
+    Keyword arguments:
+    rows, cols -- Number of crossings in each direction
+    spacing -- Distance between neighbouring crossings in meters
+    missing -- Fraction of street segments left out
+    seed -- Random seed
+    relief -- Height difference of the elevation field (see elevation_field)
+    profile -- VehicleProfile of the costs (if None, the default one)
+    """
+    rnd = np.random.default_rng(seed)
+
+    idx = np.arange(rows * cols).reshape(rows, cols)
+    x = (idx % cols) * spacing + rnd.uniform(-0.1, 0.1, idx.shape) * spacing
+    y = (idx // cols) * spacing + rnd.uniform(-0.1, 0.1, idx.shape) * spacing
+
+    pairs = np.concatenate([
+        np.stack([idx[:, :-1].ravel(), idx[:, 1:].ravel()], axis=1),
+        np.stack([idx[:-1, :].ravel(), idx[1:, :].ravel()], axis=1),
+    ])
+    pairs = pairs[rnd.random(len(pairs)) >= missing]
+
+    return _graph(x.ravel(), y.ravel(), pairs, seed, relief, profile)
+
+
+def random_geometric(n, degree=6, spacing=100, seed=0, relief=None, profile=None):
+    """
+    Nodes placed uniformly at random, connected if they are close
+
+    Keyword arguments:
+    n -- Number of nodes
+    degree -- Expected number of neighbours of a node
+    spacing -- Mean distance between nodes in meters
+    seed -- Random seed
+    relief -- Height difference of the elevation field (see elevation_field)
+    profile -- VehicleProfile of the costs (if None, the default one)
+    """
+    rnd = np.random.default_rng(seed)
+    x, y, pairs = _random_geometric_positions(n, np.sqrt(n) * spacing, rnd, degree)
+
+    return _graph(x, y, pairs, seed, relief, profile)
+
+
+def hierarchical(towns=10, town_size=100, spacing=100, road_spacing=None, neighbours=3,
+                 seed=0, relief=None, profile=None):
+    """
+    Towns of streets (random geometric graphs) connected by roads
+
+    Each town is connected to its nearest towns and along a spanning tree
+    of all towns (so the network is connected if the towns are), roads
+    are chains of nodes between the closest streets of two towns
+
+    Keyword arguments:
+    towns -- Number of towns
+    town_size -- Number of nodes of a town
+    spacing -- Mean distance between the nodes of a town in meters
+    road_spacing -- Distance between the nodes of a road
+        (if None, 5 * spacing)
+    neighbours -- Number of nearest towns a town is connected to
+    seed -- Random seed
+    relief -- Height difference of the elevation field (see elevation_field)
+    profile -- VehicleProfile of the costs (if None, the default one)
+    """
+    rnd = np.random.default_rng(seed)
+    road_spacing = road_spacing if road_spacing else 5 * spacing
+
+    town_side = np.sqrt(town_size) * spacing
+    side = np.sqrt(towns) * town_side * 3
+    centers = rnd.uniform(0, side, (towns, 2))
+
+    xs, ys, all_pairs = [], [], []
+    n = 0
+
+    for center in centers:
+        x, y, pairs = _random_geometric_positions(town_size, town_side, rnd, degree=8)
+        xs.append(x + center[0] - town_side / 2)
+        ys.append(y + center[1] - town_side / 2)
+        all_pairs.append(pairs + n)
+        n += town_size
+
+    x, y = np.concatenate(xs), np.concatenate(ys)
+
+    for a, b in _town_links(centers, neighbours):
+        # Closest streets of the two towns
+        nodes_a = np.arange(a * town_size, (a + 1) * town_size)
+        nodes_b = np.arange(b * town_size, (b + 1) * town_size)
+        d, k = cKDTree(np.stack([x[nodes_b], y[nodes_b]], axis=1)).query(
+            np.stack([x[nodes_a], y[nodes_a]], axis=1))
+        u, w = nodes_a[np.argmin(d)], nodes_b[k[np.argmin(d)]]
+
+        # Chain of road nodes from u to w
+        steps = max(1, int(np.ceil(np.min(d) / road_spacing)))
+        t = np.arange(1, steps) / steps
+        road = np.arange(n, n + steps - 1)
+
+        x = np.concatenate([x, x[u] + t * (x[w] - x[u])])
+        y = np.concatenate([y, y[u] + t * (y[w] - y[u])])
+        chain = np.concatenate([[u], road, [w]])
+        all_pairs.append(np.stack([chain[:-1], chain[1:]], axis=1))
+        n += steps - 1
+
+    return _graph(x, y, np.concatenate(all_pairs), seed, relief, profile)
+
+
+def elevation_field(x, y, seed=0, relief=None, hills=12):
+    """
+    Smooth elevations: Gaussian hills and valleys on a tilted plane
+
+    Keyword arguments:
+    x, y -- Arrays of positions in meters
+    seed -- Random seed
+    relief -- Height of the highest hills in meters
+        (if None, 3% of the extent of the positions, at most 800)
+    hills -- Number of hills and valleys
+
+    Return:
+    Array of elevations in meters (at least 0)
+    """
+    rnd = np.random.default_rng(seed + 1)
+
+    x0, y0 = x.min(initial=0), y.min(initial=0)
+    extent = max(x.max(initial=0) - x0, y.max(initial=0) - y0, 1)
+    relief = relief if relief is not None else min(0.03 * extent, 800)
+
+    gradient = rnd.uniform(-0.2, 0.2, 2) * relief / extent
+    elev = gradient[0] * (x - x0) + gradient[1] * (y - y0)
+
+    for _ in range(hills):
+        cx, cy = x0 + rnd.uniform(0, extent), y0 + rnd.uniform(0, extent)
+        width = extent * rnd.uniform(0.05, 0.25)
+        height = relief * rnd.uniform(-0.5, 1)
+
+        elev += height * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * width ** 2))
+
+    return elev - elev.min(initial=0)
+
+
+def _graph(x, y, pairs, seed, relief, profile):
+    """
+    Vertices and edges (both directions of each pair) in MapAPI format
+    """
+    elev = elevation_field(x, y, seed, relief)
+    lat, lon = y / R, x / R
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    # Like MapAPI, the two directions of a segment are consecutive edges
+    u = pairs.ravel()
+    w = pairs[:, ::-1].ravel()
+
+    length = lengths(lat[u], lon[u], lat[w], lon[w])
+    cost = (profile if profile else VehicleProfile()).costs(length, elev[w] - elev[u])
+
+    v = {
+        i: {
+            'id': i,
+            'lat': a,
+            'lon': b,
+            'elev': h,
+            'incoming': [],
+            'outgoing': []
+        }
+        for i, (a, b, h) in enumerate(zip(lat.tolist(), lon.tolist(), elev.tolist()))
+    }
+
+    e = {}
+    for eid, (a, b, c) in enumerate(zip(u.tolist(), w.tolist(), cost.tolist())):
+        e[eid] = {'id': eid, 'u': a, 'v': b, 'cost': c}
+        v[a]['outgoing'].append(eid)
+        v[b]['incoming'].append(eid)
+
+    return v, e
+
+
+def _random_geometric_positions(n, side, rnd, degree=6):
+    """
+    Positions in a square and close pairs (see random_geometric)
+    """
+    x, y = rnd.uniform(0, side, n), rnd.uniform(0, side, n)
+    radius = side * np.sqrt(degree / (np.pi * n))
+
+    return x, y, cKDTree(np.stack([x, y], axis=1)).query_pairs(radius, output_type='ndarray')
+
+
+def _town_links(centers, neighbours):
+    """
+    Pairs of towns (a, b) with a < b: nearest neighbours and the edges of
+    a minimum spanning tree
+    """
+    towns = len(centers)
+    if towns < 2:
+        return []
+
+    k = min(neighbours, towns - 1) + 1
+    _, nearest = cKDTree(centers).query(centers, k=k)
+    links = {(min(a, b), max(a, b)) for a in range(towns) for b in nearest[a][1:].tolist()}
+
+    rows, cols = np.triu_indices(towns, 1)
+    distances = np.linalg.norm(centers[rows] - centers[cols], axis=1)
+    tree = minimum_spanning_tree(coo_matrix((distances, (rows, cols)), shape=(towns, towns)))
+    tree = tree.tocoo()
+    links |= {(min(a, b), max(a, b)) for a, b in zip(tree.row.tolist(), tree.col.tolist())}
+
+    return sorted(links)
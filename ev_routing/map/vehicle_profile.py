@@ -0,0 +1,38 @@
+import numpy as np
+
+
+class VehicleProfile:
+    """Energy model of a vehicle (see MapAPI._cost)"""
+
+    def __init__(self, kappa=0.02, lmbda=1, mu=0.25, name=None):
+        """
+        Keyword arguments:
+        kappa -- Consumption per unit of length (from Moritz Baum 2017, p38)
+        lmbda -- (lambda) Consumption per unit of ascent
+        mu -- Recuperation per unit of descent
+        name -- Optional name of the vehicle
+        """
+        self.kappa = kappa
+        self.lmbda = lmbda
+        self.mu = mu
+        self.name = name
+
+    def key(self):
+        """
+        Profiles with the same key have the same costs
+        """
+        return (self.kappa, self.lmbda, self.mu)
+
+    def costs(self, length, dh):
+        """
+        Costs of edges in one vectorized pass
+
+        Keyword arguments:
+        length -- Array of edge lengths
+        dh -- Array of elevation deltas (h_v - h_u)
+        """
+        return self.kappa * length + np.where(dh >= 0, self.lmbda * dh, self.mu * dh)
+
+    def __repr__(self):
+        return 'VehicleProfile(kappa=%r, lmbda=%r, mu=%r, name=%r)' % (
+            self.kappa, self.lmbda, self.mu, self.name)
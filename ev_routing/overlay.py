@@ -0,0 +1,366 @@
+import heapq
+from multiprocessing import get_context
+from .main import EVRouting
+from .map.vehicle_profile import VehicleProfile
+from .helper import break_point
+from .helper import break_points_list
+from .helper.stats import with_stats, primitives
+
+
+class MultiLevelOverlay(EVRouting):
+    """Multi-level partition overlay with customizable edge costs"""
+
+    def __init__(self, area, M, levels=2, testing=False, scc=None, graph=None, profile=None):
+        """
+        Initializing MultiLevelOverlay class
+        by calling EVRouting initializer
+
+        Nodes are partitioned by recursive coordinate bisection, level 1
+        has 2 ** levels cells, each level above halves their number.
+        The partition does not depend on the edge costs, see customize()
+
+        Args:
+        area:
+        M: Maximum battery capacity
+        levels: Number of levels
+        scc: see EVRouting
+        graph: see EVRouting
+        profile: see EVRouting
+        """
+        EVRouting.__init__(self, area, testing=testing, scc=scc, graph=graph, profile=profile)
+
+        self.M = M
+        self.levels = levels
+
+        # path[vid]: Bisection bits of the level 1 cell of vid
+        self.path = {}
+        self._bisect(list(self.v), ())
+
+        self.edges = [
+            (e['id'], e['u'], e['v']) for e in self.e.values() if e['u'] != e['v']
+        ]
+
+        # boundary[level]: Nodes with an edge crossing a cell at that level
+        self.boundary = {
+            level: {u for _, u, w in self._cut_edges(level)}
+            | {w for _, u, w in self._cut_edges(level)}
+            for level in range(1, levels + 1)
+        }
+
+        # cliques[(level, cell)][u][w]: Function between boundary nodes
+        self.cliques = {}
+        self.functions = {}
+        # costs[eid]: Cost of the edge the cliques are customized for
+        self.costs = {}
+
+    def cell(self, level, vid):
+        """
+        :return: Id of the cell of vid at a level (1: finest)
+        """
+        return self.path[vid][:self.levels - level + 1]
+
+    def customize(self, costs=None, workers=None):
+        """
+        Computing the cliques of all cells for a set of edge costs
+
+        The cliques of level 1 cells are searched on the original edges,
+        those of a level l cell on the cliques of its level l - 1 cells and
+        the edges between them. Cells of a level are independent and can
+        be customized in parallel
+
+        Args:
+        costs: Dictionary {edge id: cost} or a VehicleProfile
+            (if None, the costs of self.e)
+        workers: Number of processes (if None or 1, no process pool)
+        """
+        if costs is None:
+            costs = {eid: e['cost'] for eid, e in self.e.items()}
+        elif isinstance(costs, VehicleProfile):
+            costs = dict(zip(self.map.edge_arrays()['id'].tolist(),
+                             self.map.costs(costs).tolist()))
+
+        self.costs = {eid: costs[eid] for eid, _, _ in self.edges}
+        self.functions = {
+            eid: break_point.init({'cost': self.costs[eid]}, self.M) for eid, _, _ in self.edges
+        }
+        self.cliques = {}
+
+        for level in range(1, self.levels + 1):
+            self._customize_cells(self._cell_tasks(level), level, workers)
+
+    def _edges_updated(self, eids):
+        """
+        Recustomizing only the cells containing changed edges (and the
+        cells above them)
+
+        Returns:
+        List of the (level, cell) recomputed
+        """
+        if not self.cliques:
+            return []
+
+        eids = set(eids)
+        changed = [(eid, u, w) for eid, u, w in self.edges if eid in eids]
+        for eid, _, _ in changed:
+            self.costs[eid] = self.e[eid]['cost']
+            self.functions[eid] = break_point.init(self.e[eid], self.M)
+
+        cells = []
+
+        for level in range(1, self.levels + 1):
+            affected = {self.cell(level, u) for _, u, w in changed
+                        if self.cell(level, u) == self.cell(level, w)}
+            tasks = [task for task in self._cell_tasks(level) if task[0] in affected]
+
+            self._customize_cells(tasks, level)
+            cells.extend((level, task[0]) for task in tasks)
+
+        return cells
+
+    def _customize_cells(self, tasks, level, workers=None):
+        """
+        Computing the cliques of the cell tasks of a level
+        """
+        if workers and workers > 1:
+            with get_context().Pool(workers) as pool:
+                results = pool.map(_clique, tasks)
+        else:
+            results = [_clique(task) for task in tasks]
+
+        for (cell, _, _, _, _), clique in zip(tasks, results):
+            self.cliques[(level, cell)] = clique
+
+    @with_stats
+    def query(self, sid, tid, b, stats=None):
+        """
+        Final SoC at tid when leaving sid with charge b
+
+        Args:
+        sid: id of the source node
+        tid: id of the target node
+        b: Initial charge
+        stats: If True, (result, helper.stats.Stats) is returned
+
+        Returns:
+        Final charge, -inf if tid is not reachable
+        """
+        soc = {sid: b}
+        queue = [(-b, sid)]
+
+        neighbours = self._neighbours
+        if stats is not None:
+            stats.pushes += 1
+            neighbours = stats.timed('neighbours', neighbours)
+
+        while queue:
+            b_u, uid = heapq.heappop(queue)
+            if -b_u < soc[uid]:
+                continue
+
+            edges = neighbours(uid, sid, tid)
+
+            if stats is not None:
+                stats.pops += 1
+                stats.relaxations += len(edges)
+
+            for vid, l in edges:
+                b_v = break_points_list._f(l, soc[uid])
+
+                if b_v > soc.get(vid, float('-inf')):
+                    soc[vid] = b_v
+                    heapq.heappush(queue, (-b_v, vid))
+
+                    if stats is not None:
+                        stats.pushes += 1
+
+        if stats is not None:
+            stats.reached = sum(b_v > float('-inf') for b_v in soc.values())
+
+        return soc.get(tid, float('-inf'))
+
+    @with_stats
+    def profile(self, sid, tid, stats=None):
+        """
+        SoC function (list of break points) from sid to tid
+
+        Args:
+        sid: id of the source node
+        tid: id of the target node
+        stats: If True, (result, helper.stats.Stats) is returned
+        """
+        neighbours = self._neighbours
+        if stats is not None:
+            neighbours = stats.timed('neighbours', neighbours)
+
+        return _profile_search(
+            sid, lambda uid: neighbours(uid, sid, tid), self.M, stats).get(
+                tid, _unreachable(self.M))
+
+    def _neighbours(self, uid, sid, tid):
+        """
+        Edges (vid, function) of the query graph leaving uid: original
+        edges near sid and tid, otherwise the clique and the cut edges of
+        the highest level at which uid is in another cell than sid and tid
+        """
+        level = self._query_level(uid, sid, tid)
+
+        if level == 0:
+            return [(self.e[eid]['v'], self.functions[eid])
+                    for eid in self.v[uid]['outgoing'] if eid in self.functions]
+
+        cell = self.cell(level, uid)
+        neighbours = list(self.cliques[(level, cell)].get(uid, {}).items())
+
+        for eid in self.v[uid]['outgoing']:
+            vid = self.e[eid]['v']
+            if eid in self.functions and self.cell(level, vid) != cell:
+                neighbours.append((vid, self.functions[eid]))
+
+        return neighbours
+
+    def _query_level(self, uid, sid, tid):
+        for level in range(self.levels, 0, -1):
+            cell = self.cell(level, uid)
+            if cell != self.cell(level, sid) and cell != self.cell(level, tid):
+                return level
+
+        return 0
+
+    def _cell_tasks(self, level):
+        """
+        :return: One task (cell, sources, targets, edges, M) per cell of a level
+        """
+        tasks = {}
+
+        for vid in self.v:
+            cell = self.cell(level, vid)
+            tasks.setdefault(cell, (cell, [], set(), {}, self.M))
+            if vid in self.boundary[level]:
+                tasks[cell][1].append(vid)
+                tasks[cell][2].add(vid)
+
+        if level == 1:
+            inner = [(eid, u, w) for eid, u, w in self.edges
+                     if self.cell(1, u) == self.cell(1, w)]
+        else:
+            inner = [(eid, u, w) for eid, u, w in self._cut_edges(level - 1)
+                     if self.cell(level, u) == self.cell(level, w)]
+
+            for (sub_level, sub_cell), clique in self.cliques.items():
+                if sub_level == level - 1:
+                    edges = tasks[sub_cell[:-1]][3]
+                    for u, row in clique.items():
+                        edges.setdefault(u, []).extend(row.items())
+
+        for eid, u, w in inner:
+            edges = tasks[self.cell(level, u)][3]
+            edges.setdefault(u, []).append((w, self.functions[eid]))
+
+        return list(tasks.values())
+
+    def _cut_edges(self, level):
+        return [(eid, u, w) for eid, u, w in self.edges
+                if self.cell(level, u) != self.cell(level, w)]
+
+    def _bisect(self, nodes, path):
+        """
+        Splitting nodes at the median of their wider coordinate range
+        """
+        if len(path) == self.levels:
+            for vid in nodes:
+                self.path[vid] = path
+            return
+
+        lat = [self.v[vid]['lat'] for vid in nodes]
+        lon = [self.v[vid]['lon'] for vid in nodes]
+        key = 'lat' if nodes and max(lat) - min(lat) >= max(lon) - min(lon) else 'lon'
+
+        nodes = sorted(nodes, key=lambda vid: (self.v[vid][key], vid))
+        half = len(nodes) // 2
+
+        self._bisect(nodes[:half], path + (0,))
+        self._bisect(nodes[half:], path + (1,))
+
+
+def _unreachable(M):
+    return [
+        break_point.new(0, float('-inf'), 0),
+        break_point.new(M, float('-inf'), 0),
+    ]
+
+
+def _clique(task):
+    """
+    Functions between the boundary nodes of a cell
+
+    :param task: (cell, sources, targets, edges, M) where edges[u] is a
+        list of (w, function) inside the cell
+    :return: Dictionary clique[u][w]
+    """
+    _, sources, targets, edges, M = task
+    clique = {}
+
+    for uid in sources:
+        f = _profile_search(uid, lambda x: edges.get(x, []), M)
+        clique[uid] = {
+            w: l for w, l in f.items()
+            if w in targets and w != uid and break_points_list.reachable(l)
+        }
+
+    return clique
+
+
+def _profile_search(sid, neighbours, M, stats=None):
+    """
+    Label-correcting profile search
+
+    :param sid: Source node
+    :param neighbours: Function returning the list of (node, function)
+        of the edges leaving a node
+    :param M: Maximum battery capacity
+    :param stats: helper.stats.Stats to be filled (if None, nothing is counted)
+    :return: Dictionary of the SoC functions of the nodes found
+    """
+    f = {sid: [
+        break_point.new(0, 0, 1),
+        break_point.new(M, M, 0),
+    ]}
+    queue, queued = [sid], {sid}
+    link, sort, merge = primitives(stats)
+
+    if stats is not None:
+        stats.pushes += 1
+
+    while queue:
+        uid = queue.pop(0)
+        queued.discard(uid)
+
+        edges = neighbours(uid)
+
+        if stats is not None:
+            stats.pops += 1
+            stats.relaxations += len(edges)
+
+        for vid, l in edges:
+            l_new = sort(link(f[uid], l))
+            if not break_points_list.reachable(l_new):
+                if stats is not None:
+                    stats.prunes += 1
+                continue
+
+            merged = merge(f.get(vid, _unreachable(M)), l_new, M)
+
+            if merged != f.get(vid):
+                f[vid] = merged
+                if vid not in queued:
+                    queue.append(vid)
+                    queued.add(vid)
+
+                    if stats is not None:
+                        stats.pushes += 1
+
+    if stats is not None:
+        stats.break_points = {vid: len(l) for vid, l in f.items()}
+        stats.reached = len(f)
+
+    return f
@@ -0,0 +1,201 @@
+import os
+import numpy as np
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from .floyd_warshall_profile import FloydWarshallProfile, _matrix_stats
+from .helper import break_points_array
+from .helper.stats import with_stats, phase
+
+
+class ParallelFloydWarshallProfile(FloydWarshallProfile):
+    """Tiled Floyd-Warshall profile on a pool of processes"""
+
+    def __init__(self, area, M, n=None, testing=False, workers=None, tile=32, scc=None,
+                 graph=None, profile=None):
+        """
+        Initializing ParallelFloydWarshallProfile class
+        by calling FloydWarshallProfile initializer
+
+        :param area:
+        :param M: Maximum battery capacity
+        :param n: Number of nodes to be considered
+            (if None, it includes all nodes within the area)
+        :param workers: Number of processes (if None, number of CPUs)
+        :param tile: Number of rows and columns of a tile
+        :param scc: see EVRouting
+        :param graph: see EVRouting
+        :param profile: see EVRouting
+        """
+        FloydWarshallProfile.__init__(self, area, M, n=n, testing=testing, scc=scc, graph=graph,
+                                      profile=profile)
+
+        self.workers = workers if workers else os.cpu_count()
+        self.tile = tile
+
+    @with_stats
+    def run(self, stats=None):
+        """
+        Floyd-Warshall profile with tiles updated in parallel
+
+        The matrix lives in shared memory as padded arrays (see
+        helper.break_points_array). For each pivot k, column k and row k are
+        copied aside, then the tiles of rows 0..k (which see row k before its
+        update) and afterwards the tiles of rows k+1..n-1 are updated by the
+        workers. Results are exactly equal to FloydWarshallProfile.run()
+
+        :param stats: If True, (None, helper.stats.Stats) is returned, the
+            work of the workers is only timed (phase 'tiles')
+        """
+        n = len(self.matrix)
+        shared = _SharedMatrix(*break_points_array.from_matrix(self.matrix))
+
+        try:
+            with get_context().Pool(self.workers) as pool:
+                for k in range(n):
+                    with phase(stats, 'copy'):
+                        shared.copy_column(k)
+                        shared.copy_row(k)
+
+                    for first, last in [(0, k + 1), (k + 1, n)]:
+                        tasks = [
+                            (shared.spec, k, (r, min(r + self.tile, last)),
+                             (c, min(c + self.tile, n)), self.M)
+                            for r in range(first, last, self.tile)
+                            for c in range(0, n, self.tile)
+                        ]
+
+                        with phase(stats, 'tiles'):
+                            overflows = pool.map(_update_tile, tasks)
+
+                        with phase(stats, 'copy'):
+                            for overflow in overflows:
+                                if overflow is not None:
+                                    shared = shared.write(*overflow)
+
+                            shared.copy_row(k)
+
+            a = shared.arrays
+            self.matrix = break_points_array.to_matrix(a['X'], a['F'], a['S'], a['L'])
+        finally:
+            shared.close(unlink=True)
+
+        if stats is not None:
+            _matrix_stats(self.matrix, stats)
+
+
+def _update_tile(task):
+    """
+    Updating a tile of the shared matrix for pivot k
+
+    :param task: (shared memory spec, k, (row start, row end),
+        (column start, column end), M)
+    :return: None if results have been written into shared memory,
+        otherwise the (wider) results to be written by the parent process
+    """
+    spec, k, (r0, r1), (c0, c1), M = task
+    a = _attach(spec)
+
+    ii, jj, X_m, F_m, S_m, L_m = break_points_array.link_and_merge(
+        a['col_X'][r0:r1], a['col_F'][r0:r1], a['col_S'][r0:r1], a['col_L'][r0:r1],
+        a['row_X'][c0:c1], a['row_F'][c0:c1], a['row_S'][c0:c1], a['row_L'][c0:c1],
+        a['X'][r0:r1, c0:c1], a['F'][r0:r1, c0:c1], a['S'][r0:r1, c0:c1],
+        a['L'][r0:r1, c0:c1], M)
+
+    ii, jj = ii + r0, jj + c0
+    width = a['X'].shape[2]
+
+    if X_m.shape[1] > width:
+        return ii, jj, X_m, F_m, S_m, L_m
+
+    a['X'][ii, jj], a['F'][ii, jj], a['S'][ii, jj] = break_points_array.widen(
+        X_m, F_m, S_m, width)
+    a['L'][ii, jj] = L_m
+
+    return None
+
+
+# Shared memory blocks attached by a worker process
+_attached = {}
+
+
+def _attach(spec):
+    """
+    Attaching (once per process) to the shared memory blocks of a spec
+
+    :return: Dictionary of NumPy arrays
+    """
+    names = {name for name, _, _ in spec.values()}
+
+    for name in list(_attached):
+        if name not in names:
+            _attached.pop(name).close()
+
+    arrays = {}
+    for key, (name, shape, dtype) in spec.items():
+        if name not in _attached:
+            _attached[name] = SharedMemory(name=name)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=_attached[name].buf)
+
+    return arrays
+
+
+class _SharedMatrix:
+    """Padded matrix arrays and copies of column k and row k in shared memory"""
+
+    def __init__(self, X, F, S, L):
+        n, _, width = X.shape
+        buffers = {
+            'X': X, 'F': F, 'S': S, 'L': L,
+            'col_X': X[:, 0], 'col_F': F[:, 0], 'col_S': S[:, 0], 'col_L': L[:, 0],
+            'row_X': X[0], 'row_F': F[0], 'row_S': S[0], 'row_L': L[0],
+        }
+
+        self.blocks, self.arrays, self.spec = [], {}, {}
+
+        for key, data in buffers.items():
+            block = SharedMemory(create=True, size=max(data.nbytes, 1))
+            self.blocks.append(block)
+            self.arrays[key] = np.ndarray(data.shape, dtype=data.dtype, buffer=block.buf)
+            self.arrays[key][...] = data
+            self.spec[key] = (block.name, data.shape, data.dtype.str)
+
+    def copy_column(self, k):
+        a = self.arrays
+        a['col_X'][...], a['col_F'][...] = a['X'][:, k], a['F'][:, k]
+        a['col_S'][...], a['col_L'][...] = a['S'][:, k], a['L'][:, k]
+
+    def copy_row(self, k):
+        a = self.arrays
+        a['row_X'][...], a['row_F'][...] = a['X'][k], a['F'][k]
+        a['row_S'][...], a['row_L'][...] = a['S'][k], a['L'][k]
+
+    def write(self, ii, jj, X_m, F_m, S_m, L_m):
+        """
+        Writing results which are wider than the shared arrays
+
+        :return: A new, widened _SharedMatrix (self is released)
+        """
+        a = self.arrays
+        width = max(a['X'].shape[2], X_m.shape[1])
+
+        X, F, S = break_points_array.widen(a['X'], a['F'], a['S'], width)
+        X[ii, jj], F[ii, jj], S[ii, jj] = break_points_array.widen(X_m, F_m, S_m, width)
+        L = a['L'].copy()
+        L[ii, jj] = L_m
+
+        widened = _SharedMatrix(X, F, S, L)
+        columns = break_points_array.widen(a['col_X'], a['col_F'], a['col_S'], width)
+        for key, column in zip(['col_X', 'col_F', 'col_S'], columns):
+            widened.arrays[key][...] = column
+        widened.arrays['col_L'][...] = a['col_L']
+
+        self.close(unlink=True)
+
+        return widened
+
+    def close(self, unlink=False):
+        self.arrays = {}
+        for block in self.blocks:
+            block.close()
+            if unlink:
+                block.unlink()
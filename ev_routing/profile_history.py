@@ -0,0 +1,116 @@
+class ProfileHistory:
+    """
+    History of a Floyd-Warshall profile matrix stored as per-step deltas
+
+    Step 0 is the initial matrix and step k + 1 the matrix after pivot k.
+    Only cells which changed at a step are recorded. Optional periodic
+    snapshots (copies of the rows, sharing the cells) speed up the
+    reconstruction of late steps. If a memory budget is given, the oldest
+    steps are folded into the base matrix and can no longer be reconstructed
+    """
+
+    # Rough sizes (bytes) of a list of break points and of a pointer
+    LIST_BYTES = 56
+    BREAK_POINT_BYTES = 8 + 64 + 3 * 24
+    POINTER_BYTES = 8
+
+    def __init__(self, matrix, snapshot_every=None, max_bytes=None):
+        """
+        :param matrix: Initial matrix (list of lists) of lists of break points
+        :param snapshot_every: Storing a snapshot every this many steps
+        :param max_bytes: Approximate memory budget of deltas and snapshots
+        """
+        self.snapshot_every = snapshot_every
+        self.max_bytes = max_bytes
+
+        self.base_step = 0
+        self.base = [list(row) for row in matrix]
+        self.current = [list(row) for row in matrix]
+        self.snapshots = {}
+        self.deltas = []
+        self.nbytes = 0
+
+    @property
+    def last_step(self):
+        return self.base_step + len(self.deltas)
+
+    def __len__(self):
+        return self.last_step + 1
+
+    def __getitem__(self, k):
+        return self.matrix_at(k)
+
+    def record(self, delta):
+        """
+        Recording the cells changed by the next step
+
+        :param delta: Dictionary {(i, j): new list of break points}
+        """
+        for (i, j), l in delta.items():
+            self.current[i][j] = l
+
+        self.deltas.append(delta)
+        self.nbytes += self._delta_bytes(delta)
+
+        step = self.last_step
+        if self.snapshot_every and step % self.snapshot_every == 0:
+            self.snapshots[step] = [list(row) for row in self.current]
+            self.nbytes += self._snapshot_bytes()
+
+        if self.max_bytes is not None:
+            while self.nbytes > self.max_bytes and self.deltas:
+                self._drop_oldest()
+
+    def matrix_at(self, k):
+        """
+        Reconstructing the matrix at step k
+
+        :param k: Step (0: initial matrix, k + 1: after pivot k)
+        :return: Matrix (list of lists) of lists of break points
+        """
+        if k < 0:
+            k += len(self)
+
+        if not self.base_step <= k <= self.last_step:
+            raise IndexError(
+                'Step %d is not available (steps %d to %d are)'
+                % (k, self.base_step, self.last_step))
+
+        start = max([s for s in self.snapshots if s <= k], default=self.base_step)
+        matrix = [list(row) for row in self.snapshots.get(start, self.base)]
+
+        for delta in self.deltas[start - self.base_step:k - self.base_step]:
+            for (i, j), l in delta.items():
+                matrix[i][j] = l
+
+        return matrix
+
+    def changed_cells(self, k):
+        """
+        :param k: Step (> 0)
+        :return: Cells (i, j) changed at step k
+        """
+        return list(self.deltas[k - 1 - self.base_step].keys())
+
+    def _drop_oldest(self):
+        """
+        Folding the oldest delta into the base matrix
+        """
+        delta = self.deltas.pop(0)
+
+        for (i, j), l in delta.items():
+            self.base[i][j] = l
+
+        self.base_step += 1
+        self.nbytes -= self._delta_bytes(delta)
+
+        if self.snapshots.pop(self.base_step, None) is not None:
+            self.nbytes -= self._snapshot_bytes()
+
+    def _delta_bytes(self, delta):
+        return sum(
+            self.LIST_BYTES + self.BREAK_POINT_BYTES * len(l)
+            for l in delta.values())
+
+    def _snapshot_bytes(self):
+        return self.POINTER_BYTES * sum(len(row) for row in self.current)
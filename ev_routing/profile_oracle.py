@@ -0,0 +1,97 @@
+import os
+import numpy as np
+from .helper import packing
+from .helper.stats import with_stats, phase
+
+
+def export(matrix, M, vid, path):
+    """
+    Writing a matrix of SoC functions to a profile store
+
+    The store is a directory of .npy files: offsets and packed break points
+    (see helper.packing), the vertex ids of the rows/columns and M
+
+    :param matrix: n x n matrix (list of lists) of lists of break points
+    :param M: Maximum battery capacity
+    :param vid: Vertex ids of the rows (and columns) of the matrix
+    :param path: Directory of the store (created if needed)
+    """
+    offsets, break_points = packing.pack(matrix)
+
+    os.makedirs(path, exist_ok=True)
+
+    np.save(os.path.join(path, 'offsets.npy'), offsets)
+    np.save(os.path.join(path, 'break_points.npy'), break_points)
+    np.save(os.path.join(path, 'vid.npy'), np.array(vid[:len(matrix)]))
+    np.save(os.path.join(path, 'M.npy'), np.array(M, dtype=np.float64))
+
+
+class ProfileOracle:
+    """Read-only all-pairs SoC profile store answering queries in O(log k)"""
+
+    def __init__(self, path):
+        """
+        Opening a profile store written by export (or
+        FloydWarshallProfile.export), the arrays are memory-mapped so only
+        the pages touched by queries are read
+
+        :param path: Directory of the store
+        """
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+        self.break_points = np.load(
+            os.path.join(path, 'break_points.npy'), mmap_mode='r')
+        self.vid = np.load(os.path.join(path, 'vid.npy'), mmap_mode='r')
+        self.M = float(np.load(os.path.join(path, 'M.npy')))
+
+        self.n = len(self.vid)
+        self._index = None
+
+    def index(self, vid):
+        """
+        :param vid: Vertex id
+        :return: Index of the vertex in the store
+        """
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.vid.tolist())}
+
+        return self._index[vid]
+
+    def function(self, s, t):
+        """
+        :param s: Index of the source
+        :param t: Index of the target
+        :return: (k, 3) array of the break points from s to t
+        """
+        return packing.cell(self.offsets, self.break_points, self.n, s, t)
+
+    @with_stats
+    def query(self, s, t, b, stats=None):
+        """
+        Arrival SoC at t when leaving s with initial charge b
+
+        :param s: Index of the source
+        :param t: Index of the target
+        :param b: Initial charge (0 <= b <= M)
+        :param stats: If True, (result, helper.stats.Stats) is returned
+        :return: Final charge, -inf if t is not reachable
+        """
+        if not 0 <= b <= self.M:
+            raise ValueError('Initial charge is out of [0, M]', b)
+
+        with phase(stats, 'read'):
+            l = self.function(s, t)
+
+        if stats is not None:
+            stats.break_points = {t: len(l)}
+
+        idx = int(np.searchsorted(l[:, 0], b, side='right')) - 1
+
+        if idx < 0:
+            return float('-inf')
+
+        x, f, slope = l[idx]
+
+        if f == float('-inf'):
+            return float('-inf')
+
+        return float(f + slope * (b - x)) if idx < len(l) - 1 else float(f)
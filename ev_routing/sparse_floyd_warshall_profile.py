@@ -0,0 +1,164 @@
+from .main import EVRouting
+from .floyd_warshall_profile import FloydWarshallProfile, _matrix_stats
+from .helper import break_point
+from .helper import break_points_list
+from .helper.stats import with_stats, primitives
+
+
+class SparseFloydWarshallProfile(FloydWarshallProfile):
+    """Floyd-Warshall profile over reachable pairs only"""
+
+    def __init__(self, area, M, n=None, testing=False, scc=None, graph=None, profile=None):
+        """
+        Initializing SparseFloydWarshallProfile class
+        by calling EVRouting initializer
+
+        Only reachable cells are stored, all unreachable cells share
+        self.unreachable. self.reaches[i] and self.reached_by[j] are
+        bitsets (ints) of the columns reachable from row i and of the rows
+        reaching column j
+
+        :param area:
+        :param M: Maximum battery capacity
+        :param n: Number of nodes to be considered
+            (if None, it includes all nodes within the area)
+        :param scc: see EVRouting
+        :param graph: see EVRouting
+        :param profile: see EVRouting
+        """
+        EVRouting.__init__(self, area, testing=testing, scc=scc, graph=graph, profile=profile)
+
+        self.M = M
+        self.unreachable = [
+            break_point.new(0, float('-inf'), 0),
+            break_point.new(M, float('-inf'), 0),
+        ]
+
+        n = n if n else len(self.v)
+        index = {vid: i for i, vid in enumerate(self.vid[:n])}
+
+        self.matrix = [_SparseRow(n, self.unreachable) for _ in range(n)]
+        self.reaches = [0] * n
+        self.reached_by = [0] * n
+
+        for i in range(n):
+            self._set(i, i, [
+                break_point.new(0, 0, 1),
+                break_point.new(M, M, 0),
+            ])
+
+            connected = set()
+
+            for eid in self.v[self.vid[i]]['outgoing']:
+                e = self.e[eid]
+                j = index.get(e['v'])
+
+                # Like map.connected, the first edge from i to j is taken
+                if j is None or j == i or j in connected:
+                    continue
+
+                connected.add(j)
+                self._set(i, j, break_point.init(e, M))
+
+    @with_stats
+    def run(self, stats=None):
+        """
+        Floyd-Warshall profile iterating, for each pivot k, only over rows i
+        reaching k and columns j reachable from k
+
+        :param stats: If True, (None, helper.stats.Stats) is returned,
+            prunes counts the cells skipped thanks to the bitsets
+        """
+        n = len(self.matrix)
+        link, sort, merge = primitives(stats)
+
+        for k in range(n):
+            rows = _bits(self.reached_by[k])
+            cols = list(_bits(self.reaches[k]))
+
+            if stats is not None:
+                rows = list(rows)
+                stats.prunes += n * n - len(rows) * len(cols)
+
+            for i in rows:
+                l_ik = self.matrix[i][k]
+
+                for j in cols:
+                    l_kj = self.matrix[k][j]
+
+                    l_new = link(l_ik, l_kj)
+                    l_new = sort(l_new)
+
+                    self._set(i, j, merge(self.matrix[i][j], l_new, self.M))
+
+        if stats is not None:
+            _matrix_stats(self.matrix, stats)
+
+    def repair(self, eids):
+        """
+        Recomputing the cells whose paths may pass through changed edges
+        (see FloydWarshallProfile.repair) and updating the bitsets
+        """
+        cells = self._repair(self.matrix, eids)
+
+        for i, j in cells:
+            self._set(i, j, self.matrix[i][j])
+
+        return cells
+
+    def reachable_pairs(self):
+        """
+        :return: Number of stored (reachable) pairs
+        """
+        return sum(bin(b).count('1') for b in self.reaches)
+
+    def _set(self, i, j, l):
+        """
+        Storing a function and updating the reachability bitsets,
+        unreachable functions are dropped (see self.unreachable)
+        """
+        if break_points_list.reachable(l):
+            self.matrix[i][j] = l
+            self.reaches[i] |= 1 << j
+            self.reached_by[j] |= 1 << i
+        elif j in self.matrix[i]:
+            del self.matrix[i][j]
+            self.reaches[i] &= ~(1 << j)
+            self.reached_by[j] &= ~(1 << i)
+
+
+def _bits(b):
+    """
+    Indices of the set bits of an int
+    """
+    while b:
+        low = b & -b
+        yield low.bit_length() - 1
+        b ^= low
+
+
+class _SparseRow:
+    """A row of the matrix storing only reachable cells"""
+
+    def __init__(self, n, default):
+        self.n = n
+        self.default = default
+        self.cells = {}
+
+    def __getitem__(self, j):
+        return self.cells.get(j, self.default)
+
+    def __setitem__(self, j, l):
+        self.cells[j] = l
+
+    def __delitem__(self, j):
+        del self.cells[j]
+
+    def __contains__(self, j):
+        return j in self.cells
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return (self[j] for j in range(self.n))
@@ -0,0 +1,66 @@
+from .dijkstra_profile import DijkstraProfile
+from . import profile_oracle
+from .floyd_warshall_profile import _matrix_stats
+from .helper.stats import with_stats
+
+
+class SubsetProfile(DijkstraProfile):
+    """Profile matrix over an explicit subset of nodes"""
+
+    def __init__(self, area, M, nodes, testing=False, scc=None, graph=None, profile=None):
+        """
+        Initializing SubsetProfile class
+        by calling DijkstraProfile initializer
+
+        Args:
+        area:
+        M: Maximum battery capacity
+        nodes: Ids of the nodes of the matrix (e.g. charging stations,
+            depots and query endpoints), paths may use any node
+        scc: see EVRouting
+        graph: see EVRouting
+        profile: see EVRouting
+        """
+        DijkstraProfile.__init__(self, area, M, testing=testing, scc=scc, graph=graph,
+                                 profile=profile)
+
+        self.nodes = list(nodes)
+        self.matrix = []
+
+    @with_stats
+    def run(self, stats=None):
+        """
+        Filling self.matrix (like FloydWarshallProfile.matrix, but indexed
+        by the positions in self.nodes) with one profile search per source
+        over the whole graph
+
+        Args:
+        stats: If True, (None, helper.stats.Stats) is returned, counting
+            all searches
+        """
+        self.matrix = []
+
+        for sid in self.nodes:
+            f = self._search(sid, stats=stats)
+            self.matrix.append([f[tid] for tid in self.nodes])
+
+        if stats is not None:
+            _matrix_stats(self.matrix, stats)
+
+    def _edges_updated(self, eids):
+        """
+        Rows are single searches over the whole graph, so a matrix which
+        has been filled is filled again
+        """
+        if self.matrix:
+            self.run()
+
+    def export(self, path):
+        """
+        Writing self.matrix to a memory-mapped profile store
+        (see profile_oracle.ProfileOracle)
+
+        Args:
+        path: Directory of the store
+        """
+        profile_oracle.export(self.matrix, self.M, self.nodes, path)
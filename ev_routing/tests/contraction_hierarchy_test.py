@@ -0,0 +1,79 @@
+import pytest
+from ..contraction_hierarchy import ContractionHierarchy
+from ..floyd_warshall_profile import FloydWarshallProfile
+from ..helper import break_points_list
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+
+
+def max_soc(ch, sid, b):
+    """Label-correcting reference search on the original graph"""
+    soc = {vid: float('-inf') for vid in ch.v}
+    soc[sid] = b
+
+    changed = True
+    while changed:
+        changed = False
+        for e in ch.e.values():
+            b_v = soc[e['u']] - e['cost']
+            b_v = float('-inf') if b_v < 0 else min(ch.M, b_v)
+
+            if b_v > soc[e['v']]:
+                soc[e['v']] = b_v
+                changed = True
+
+    return soc
+
+
+def test_query():
+    for M in [5, 10, 300]:
+        ch = ContractionHierarchy(AREA, M, testing=True)
+        ch.preprocess()
+
+        assert sorted(ch.rank.values()) == list(range(len(ch.v)))
+
+        for sid in ch.v:
+            for b in [0, 1, 2.5, M / 2, M]:
+                soc = max_soc(ch, sid, b)
+
+                for tid in ch.v:
+                    assert ch.query(sid, tid, b) == soc[tid]
+
+
+def test_profile():
+    for M in [5, 10, 300]:
+        ch = ContractionHierarchy(AREA, M, testing=True)
+        ch.preprocess()
+
+        fw = FloydWarshallProfile(AREA, M, testing=True)
+        fw.run()
+
+        for i, sid in enumerate(fw.vid):
+            for j, tid in enumerate(fw.vid):
+                f = ch.profile(sid, tid)
+
+                for b in [0, 1, 2.5, M / 3, M / 2, 0.75 * M, M]:
+                    assert break_points_list._f(f, b) == break_points_list._f(fw.matrix[i][j], b)
+                    assert break_points_list._f(f, b) == pytest.approx(ch.query(sid, tid, b))
+
+
+def test_table():
+    for M in [5, 10]:
+        ch = ContractionHierarchy(AREA, M, testing=True)
+        ch.preprocess()
+
+        sources, targets = [0, 2, 4, 9], [1, 3, 5, 7, 8]
+
+        for b in [0, 2.5, M]:
+            table = ch.table(sources, targets, b)
+
+            assert table.shape == (4, 5)
+            assert table.tolist() == [
+                [ch.query(sid, tid, b) for tid in targets] for sid in sources
+            ]
+
+        table = ch.profile_table(sources, targets, G=5)
+
+        assert table.shape == (4, 5, 5)
+        for k, b in enumerate([0, M / 4, M / 2, 3 * M / 4, M]):
+            assert table[:, :, k].tolist() == ch.table(sources, targets, b).tolist()
@@ -1,4 +1,29 @@
+import pytest
 from ..cs_floyd_warshall import CSFloydWarshall
+from ..helper import break_points_list as bp_list
+
+
+def _max_soc(v, e, M, stations, sid, charge):
+    """
+    Brute force: maximum SoC at each node when leaving sid with the given
+    charge, the battery being charged to M at each of the stations
+    """
+    soc = {vid: float('-inf') for vid in v}
+    soc[sid] = charge
+
+    changed = True
+    while changed:
+        changed = False
+        for edge in e.values():
+            start = M if edge['u'] in stations and soc[edge['u']] >= 0 else soc[edge['u']]
+            end = start - edge['cost']
+            end = float('-inf') if end < 0 else min(M, end)
+
+            if end > soc[edge['v']] + 1e-9:
+                soc[edge['v']] = end
+                changed = True
+
+    return soc
 
 
 def test_csfw():
@@ -16,5 +41,86 @@ def test_csfw():
     return
 
 
+def test_checkpoint(tmp_path):
+    area = [52.51, 13.373, 52.52, 13.401]
+    checkpoint = str(tmp_path / 'csfw.npz')
+
+    csfw = CSFloydWarshall(area, 5, testing=True, station_id=[4, 8], checkpoint=checkpoint)
+    resumed = CSFloydWarshall(area, 5, testing=True, station_id=[4, 8], checkpoint=checkpoint)
+
+    assert resumed.matrix == csfw.matrix
+
+
+def test_stations_graph():
+    area = [52.51, 13.373, 52.52, 13.401]
+    M = 5
+
+    csfw = CSFloydWarshall(area, M, testing=True, station_id=list(range(10)))
+    n = csfw.n_nodes
+
+    costs = [[0 if i == j else float('inf') for j in range(n)] for i in range(n)]
+    for i in range(n):
+        for j in range(n):
+            e = csfw.map.connected(csfw.vid[i], csfw.vid[j])
+            if i != j and e and e['cost'] <= M:
+                costs[i][j] = e['cost']
+
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                costs[i][j] = min(costs[i][j], costs[i][k] + costs[k][j])
+
+    assert csfw.min_costs.tolist() == costs
+
+    for i in range(n):
+        for j in range(n):
+            for u, v, c in csfw.stations[i][j]:
+                assert csfw.map.connected(csfw.vid[u], csfw.vid[v])['cost'] == c
+
+
+def test_final_workers():
+    area = [52.51, 13.373, 52.52, 13.401]
+
+    csfw = CSFloydWarshall(area, 10, testing=True, station_id=[0, 3, 5])
+    fw_matrix = csfw.matrix
+    csfw.final()
+
+    parallel = CSFloydWarshall(area, 10, testing=True, station_id=[0, 3, 5])
+    parallel.final(workers=2)
+
+    assert parallel.matrix == csfw.matrix
+    assert csfw.matrix != fw_matrix
+
+    # The battery is not charged at the target
+    for i, sid in enumerate(csfw.vid):
+        for j, tid in enumerate(csfw.vid):
+            if i == j:
+                continue
+
+            stations = set(csfw.station_vid) - {tid}
+            for charge in [0, 1, 2.5, 5, 7.5, 10]:
+                soc = _max_soc(csfw.v, csfw.e, 10, stations, sid, charge)
+                assert bp_list._f(csfw.matrix[i][j], charge) == pytest.approx(soc[tid])
+
+
+def test_add_and_remove_station():
+    area = [52.51, 13.373, 52.52, 13.401]
+
+    for M in [5, 10]:
+        csfw = CSFloydWarshall(area, M, testing=True, station_id=[0, 3])
+        csfw.final()
+
+        cells = csfw.add_station(5)
+        assert 0 < len(cells) < csfw.n_nodes * (csfw.n_nodes - 1)
+
+        expected = CSFloydWarshall(area, M, testing=True, station_id=[0, 3, 5])
+        expected.final()
+        assert csfw.matrix == expected.matrix
+        assert csfw.stations == expected.stations
 
+        csfw.remove_station(0)
 
+        expected = CSFloydWarshall(area, M, testing=True, station_id=[3, 5])
+        expected.final()
+        assert csfw.matrix == expected.matrix
+        assert csfw.stations == expected.stations
@@ -1,5 +1,6 @@
 from ..dijkstra_profile import DijkstraProfile
 from ..helper import break_point as break_point
+from ..helper import packing
 
 
 def test_if_main_works():
@@ -40,3 +41,24 @@ def test_target_prune():
     value = dp._target_prune(f_vid, f_tid)
 
     assert value is True
+
+
+def test_alpha_without_elevations():
+    dp = DijkstraProfile([52.51, 13.373, 52.52, 13.401], 5, testing=True)
+
+    assert dp._alpha() == 1
+
+
+def test_run_one_to_all_and_many():
+    dp = DijkstraProfile([52.51, 13.373, 52.52, 13.401], 10, testing=True)
+
+    vids, offsets, break_points = dp.run_one_to_all(0)
+    f = packing.unpack(offsets, break_points, (1, len(vids)))[0]
+
+    assert vids[0] == 0 and len(vids) == len(dp.v)
+    full = dp._search(0)
+    for vid, f_vid in zip(vids, f):
+        assert f_vid == full[vid]
+
+    assert list(dp.run_many(0, [1, 5, 8])) == [1, 5, 8]
+    assert dp.run_many(0, [5]) == {5: dp.run(0, 5)}
@@ -9,4 +9,22 @@ def test_if_main_works():
     evr = Dijkstra(area)
 
     assert isinstance(evr.v, dict)
-    assert isinstance(evr.e, dict)
\ No newline at end of file
+    assert isinstance(evr.e, dict)
+
+
+def test_isochrone():
+    area = [52.51, 13.373, 52.52, 13.401]
+    evr = Dijkstra(area, testing=True)
+
+    nodes, soc, boundary = evr.isochrone(0, 3, M=10)
+
+    assert nodes.tolist() == [0, 1, 2, 3, 4, 6, 8]
+    assert soc.tolist() == [3, 5, 5, 4, 0, 2, 0]
+    assert boundary.tolist() == [9, 10, 17]
+
+    # Nodes are not reached below b_min
+    nodes, soc, boundary = evr.isochrone(0, 3, M=10, b_min=1)
+
+    assert nodes.tolist() == [0, 3, 6]
+    assert soc.tolist() == [3, 1, 2]
+    assert boundary.tolist() == [3, 7, 15]
@@ -0,0 +1,46 @@
+from ..dijkstra import Dijkstra
+from ..dijkstra_profile import DijkstraProfile
+from ..helper import break_points_list
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+
+
+def test_feasible():
+    M = 10
+    d = Dijkstra(AREA, testing=True)
+    # Node 9 can not be reached anymore
+    d.update_edges({17: float('inf'), 18: float('inf')})
+    d.set_feasibility(3)
+
+    oracle = d.feasibility
+    assert oracle.reachable(9, 0) and not oracle.reachable(0, 9)
+
+    rejected = 0
+
+    for sid in d.v:
+        for b in [0, 1, 2, 5, M]:
+            nodes, _, _ = d.isochrone(sid, b, M=M)
+            reached = {d.vid[i] for i in nodes}
+
+            for tid in d.v:
+                if not oracle.feasible(sid, tid, b):
+                    assert tid not in reached
+                    rejected += 1
+
+    assert rejected > 0
+
+
+def test_searches():
+    M = 10
+    dp = DijkstraProfile(AREA, M, testing=True)
+    dp.update_edges({17: float('inf'), 18: float('inf')})
+    dp.set_feasibility(3)
+
+    assert not break_points_list.reachable(dp.run(0, 9))
+    assert break_points_list.reachable(dp.run(9, 0))
+
+    d = Dijkstra(AREA, testing=True)
+    d.set_feasibility(3)
+    soc, _, trace = d.dijkstra(4, 5, 0, M)
+
+    assert soc['b'] == float('-inf') and trace == []
@@ -0,0 +1,40 @@
+import numpy as np
+from ..floyd_warshall_grid import FloydWarshallGrid
+from ..helper import break_points_list as bp_list
+
+AREA = [52.514e0, 13.385e0, 52.516e0, 13.387e0]
+M = 10
+
+
+def test_run():
+    fw = FloydWarshallGrid(AREA, M, G=11, testing=True)
+    fw.run()
+
+    assert fw.grid.shape == (10, 10, 11)
+
+    # Direct edge from 4 to 6 with cost 2
+    assert fw.grid[4, 6, 8] == 6
+    # 4 -> 1 (-5) -> 3 (2) reaches 3 with a full battery
+    assert fw.grid[4, 3, 5] == 8
+
+    matrix = fw.break_points_matrix()
+
+    for i in range(10):
+        for j in range(10):
+            for x in range(M + 1):
+                y = bp_list._f(matrix[i][j], x)
+                assert y == fw.grid[i, j, x] or (np.isneginf(y) and y <= fw.grid[i, j, x])
+
+
+def test_repair():
+    fw = FloydWarshallGrid(AREA, M, G=11, testing=True)
+    fw.run()
+    costs = {eid: fw.e[eid]['cost'] for eid in [0, 17]}
+
+    fw.update_edges({0: float('inf'), 17: float('inf')})
+    fw.update_edges(costs)
+
+    expected = FloydWarshallGrid(AREA, M, G=11, testing=True)
+    expected.run()
+
+    assert np.array_equal(fw.grid, expected.grid)
@@ -1,4 +1,6 @@
+import pytest
 from ..floyd_warshall_profile import FloydWarshallProfile
+from ..helper import break_points_list
 
 BL = {'lat': 52.514e0, 'lon': 13.385e0}  # Bottom left corner coordinate
 TR = {'lat': 52.516e0, 'lon': 13.387e0}  # Top right corner coordinate
@@ -22,3 +24,151 @@ def test_run():
 def test_run_with_history():
     fw = FloydWarshallProfile(AREA, M, n=16)
     history = fw.run_with_history()
+
+
+def test_run_simplified():
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    fw.run(max_break_points=3)
+
+    for row in fw.matrix:
+        for l in row:
+            assert len(l) <= 3
+
+    assert fw.simplify_step_error >= 0
+
+    # Cells needing a minimum charge stay reachable
+    exact = FloydWarshallProfile(AREA, M, testing=True)
+    exact.run()
+
+    for k in [2, 3]:
+        fw = FloydWarshallProfile(AREA, M, testing=True)
+        fw.run(max_break_points=k)
+
+        assert fw.simplify_step_error < float('inf')
+        for row, exact_row in zip(fw.matrix, exact.matrix):
+            for l, exact_l in zip(row, exact_row):
+                assert break_points_list.reachable(l) == break_points_list.reachable(exact_l)
+                assert break_points_list.dominates(exact_l, l)
+
+    with pytest.raises(ValueError):
+        FloydWarshallProfile(AREA, M, testing=True).run(max_break_points=0)
+
+
+def test_run_vectorized():
+    for capacity in [5, 10, M]:
+        fw = FloydWarshallProfile(AREA, capacity, testing=True)
+        fw.run()
+        matrix = fw.matrix
+
+        fw = FloydWarshallProfile(AREA, capacity, testing=True)
+        fw.run_vectorized(max_cells=30)
+
+        assert fw.matrix == matrix
+
+
+def test_run_with_delta_history():
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    history = fw.run_with_history()
+
+    delta_history = fw.run_with_delta_history(snapshot_every=3)
+
+    assert len(delta_history) == len(history) == 11
+
+    for k in range(len(history)):
+        assert delta_history[k] == history[k]
+
+    budget = delta_history.nbytes // 2
+    delta_history = fw.run_with_delta_history(max_bytes=budget)
+
+    assert delta_history.nbytes <= budget
+    assert delta_history.base_step > 0
+    assert delta_history[-1] == history[-1]
+
+
+def test_checkpoint_and_resume(tmp_path):
+    checkpoint = str(tmp_path / 'fw.npz')
+
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    fw.run()
+    matrix = fw.matrix
+
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    save_checkpoint = fw.save_checkpoint
+
+    def save_checkpoint_and_die(path, k):
+        save_checkpoint(path, k)
+        if k == 4:
+            raise RuntimeError('Preempted')
+
+    fw.save_checkpoint = save_checkpoint_and_die
+
+    with pytest.raises(RuntimeError):
+        fw.run(checkpoint=checkpoint, checkpoint_every=2)
+
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+
+    assert fw.load_checkpoint(checkpoint) == 4
+
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    fw.resume(checkpoint)
+
+    assert fw.matrix == matrix
+    assert fw.load_checkpoint(checkpoint) == 10
+
+
+def test_update_edges():
+    n_cells = {}
+
+    for capacity in [5, 10]:
+        fw = FloydWarshallProfile(AREA, capacity, testing=True)
+        fw.run()
+        cells = fw.update_edges({0: float('inf'), 23: 3})
+
+        n_cells[capacity] = len(cells)
+        assert fw.map.changed_edges == {0: 1, 23: -2}
+
+        expected = FloydWarshallProfile(AREA, capacity, testing=True)
+        expected.e[0]['cost'] = float('inf')
+        expected.e[23]['cost'] = 3
+        expected.matrix = [
+            [expected._initial_cell(i, j) for j in range(len(fw.matrix))]
+            for i in range(len(fw.matrix))
+        ]
+        expected.run()
+
+        assert fw.matrix == expected.matrix
+
+    # New paths are searched regardless of the battery
+    assert 0 < n_cells[5] <= n_cells[10] == 100
+
+
+def test_update_edges_reopened():
+    fw = FloydWarshallProfile(AREA, 10, testing=True)
+    fw.run()
+
+    costs = {eid: fw.e[eid]['cost'] for eid in [0, 17]}
+    fw.update_edges({0: float('inf'), 17: float('inf')})
+    # New paths may use both reopened edges
+    fw.update_edges(costs)
+
+    expected = FloydWarshallProfile(AREA, 10, testing=True)
+    expected.run()
+
+    assert fw.matrix == expected.matrix
+
+
+def test_update_edges_decreased():
+    fw = FloydWarshallProfile(AREA, 10, testing=True)
+    fw.run()
+    fw.update_edges({0: -1, 17: 0, 24: 0})
+
+    expected = FloydWarshallProfile(AREA, 10, testing=True)
+    for eid, cost in {0: -1, 17: 0, 24: 0}.items():
+        expected.e[eid]['cost'] = cost
+    expected.matrix = [
+        [expected._initial_cell(i, j) for j in range(len(fw.matrix))]
+        for i in range(len(fw.matrix))
+    ]
+    expected.run()
+
+    assert fw.matrix == expected.matrix
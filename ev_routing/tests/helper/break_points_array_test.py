@@ -0,0 +1,64 @@
+from ...helper import break_points_array as bp_array
+from ...helper import break_points_list as bp_list
+
+L1 = [(0, float('-inf'), 0), (2, 0, 1), (3, 4, 1), (8, 9, 0), (10, 9, 0)]
+L2 = [(0, 2, 1), (8, 10, 0), (10, 10, 0)]
+L3 = [(0, float('-inf'), 0), (4, 0, 1), (10, 6, 0)]
+M = 10
+
+
+def _row(lists):
+    X, F, S, L = bp_array.from_matrix([lists])
+    return X[0], F[0], S[0], L[0]
+
+
+def test_link_sort_and_merge():
+    pairs = [(a, b) for a in [L1, L2, L3] for b in [L1, L2, L3]]
+
+    x, f, s, La = _row([a for a, _ in pairs])
+    X, F, S, L = _row([b for _, b in pairs])
+
+    X_new, F_new, S_new, valid = bp_array.link(x, f, s, La, X, F, S, L)
+    X_new, F_new, S_new, L_new = bp_array.sort(X_new, F_new, S_new, valid)
+
+    X_m, F_m, S_m, L_m = bp_array.merge(x, f, s, La, X_new, F_new, S_new, L_new, M)
+
+    for r, (a, b) in enumerate(pairs):
+        l_new = bp_list.sort(bp_list.link(a, b))
+
+        assert bp_array.to_list(X_new[r], F_new[r], S_new[r], L_new[r]) == l_new
+        assert bp_array.to_list(X_m[r], F_m[r], S_m[r], L_m[r]) == bp_list.merge(a, l_new, M)
+
+
+def test_merge():
+    identity = [(0, 0, 1), (10, 10, 0)]
+    late = [(0, float('-inf'), 0), (2, 0, 1), (10, 8, 0)]
+
+    # Crossing of slopes 1 and 0, -inf prefixes and crossings at or after M
+    pairs = [
+        (identity, [(0, 4, 0), (10, 4, 0)]),
+        (late, [(0, float('-inf'), 0), (1, 5, 0), (10, 5, 0)]),
+        (late, [(0, 6, 0), (10, 6, 0)]),
+        (identity, [(0, 10, 0), (10, 10, 0)]),
+        ([(0, float('-inf'), 0), (3, 0, 1), (10, 7, 0)], [(0, 8, 0), (10, 8, 0)]),
+    ]
+    pairs += [(b, a) for a, b in pairs]
+
+    X1, F1, S1, L1 = _row([a for a, _ in pairs])
+    X2, F2, S2, L2 = _row([b for _, b in pairs])
+
+    X, F, S, L = bp_array.merge(X1, F1, S1, L1, X2, F2, S2, L2, M)
+
+    for r, (a, b) in enumerate(pairs):
+        assert bp_array.to_list(X[r], F[r], S[r], L[r]) == bp_list.merge(a, b, M)
+
+
+def test_remove_redundant_break_points():
+    lst = [(0, 0, 1), (12.34, 12.34, 1), (23.45, 23.4504, 1), (45.67, 45.67, 0), (100, 100, 0)]
+    X, F, S, L = _row([lst])
+
+    X, F, S, L = bp_array.remove_redundant_break_points(X, F, S, L)
+
+    bp_list._remove_redundant_break_points(lst)
+
+    assert bp_array.to_list(X[0], F[0], S[0], L[0]) == lst
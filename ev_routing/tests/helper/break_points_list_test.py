@@ -32,6 +32,32 @@ def test_remove_redundant_break_points():
     assert lst == [bp.new(0, 0, 1), (100, 100, 0)]
 
 
+def test_merge():
+    identity = [bp.new(0, 0, 1), bp.new(10, 10, 0)]
+    late = [bp.new(0, float('-inf'), 0), bp.new(2, 0, 1), bp.new(10, 8, 0)]
+
+    cases = [
+        # Slope 1 overtaking slope 0
+        (identity, [bp.new(0, 4, 0), bp.new(10, 4, 0)],
+         [(0, 4, 0), (4, 4, 1), (10, 10, 0)]),
+        # -inf prefix on one side
+        (late, [bp.new(0, float('-inf'), 0), bp.new(1, 5, 0), bp.new(10, 5, 0)],
+         [(0, float('-inf'), 0), (1, 5, 0), (7, 5, 1), (10, 8, 0)]),
+        (late, [bp.new(0, 6, 0), bp.new(10, 6, 0)],
+         [(0, 6, 0), (8, 6, 1), (10, 8, 0)]),
+        # Crossing at M and after M
+        (identity, [bp.new(0, 10, 0), bp.new(10, 10, 0)],
+         [(0, 10, 0), (10, 10, 0)]),
+        ([bp.new(0, float('-inf'), 0), bp.new(3, 0, 1), bp.new(10, 7, 0)],
+         [bp.new(0, 8, 0), bp.new(10, 8, 0)],
+         [(0, 8, 0), (10, 8, 0)]),
+    ]
+
+    for l1, l2, expected in cases:
+        assert bp_list.merge(l1, l2, 10) == expected
+        assert bp_list.merge(l2, l1, 10) == expected
+
+
 def test_reachable():
     lst = [
         bp.new(0, float('-inf'), 0),
@@ -63,3 +89,49 @@ def test_final_merge():
     assert merged[3] == (10, -30, 1)
     assert merged[4] == (12, -27, 1)
     assert merged[5] == (15, -24, 0)
+
+
+def test_simplify():
+    lst = [(0, float('-inf'), 0), (2, 0, 1), (3, 4, 1), (8, 9, 0), (10, 9, 0)]
+
+    assert bp_list.simplify(lst) == (lst, 0)
+    assert bp_list.simplify(lst, eps=1) == (lst, 0)
+
+    simplified, err = bp_list.simplify(lst, max_break_points=4)
+
+    assert len(simplified) == 4
+    assert err == 2
+
+    assert bp_list._f(simplified, 1) == float('-inf')
+
+    for x in [2, 2.5, 3, 5, 7.9, 8, 9.5, 10]:
+        assert bp_list._f(simplified, x) <= bp_list._f(lst, x)
+        assert bp_list._f(lst, x) - bp_list._f(simplified, x) <= err
+
+    simplified, err = bp_list.simplify(lst, eps=3)
+
+    assert simplified == [(0, float('-inf'), 0), (2, 0, 1), (10, 9, 0)]
+    assert err == 3
+
+    # The reach break point of a function needing a minimum charge is kept
+    for k in [2, 3]:
+        simplified, err = bp_list.simplify(lst, max_break_points=k)
+
+        assert simplified == [(0, float('-inf'), 0), (2, 0, 1), (10, 9, 0)]
+        assert err == 3
+
+    lst = [(0, float('-inf'), 0), (3, 0, 1), (10, 7, 0)]
+    assert bp_list.simplify(lst, max_break_points=2) == (lst, 0)
+
+
+def test_dominates():
+    lst = [(0, float('-inf'), 0), (2, 0, 1), (3, 4, 1), (8, 9, 0), (10, 9, 0)]
+    lower = [(0, float('-inf'), 0), (2, 0, 1), (10, 8, 0)]
+
+    assert bp_list.dominates(lst, lower)
+    assert bp_list.dominates(lst, lst)
+    assert not bp_list.dominates(lower, lst)
+
+    # Equal at all break points, but lower just before x = 3
+    step = [(0, float('-inf'), 0), (2, 0, 0), (3, 4, 1), (8, 9, 0), (10, 9, 0)]
+    assert not bp_list.dominates(step, lst)
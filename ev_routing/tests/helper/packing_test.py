@@ -0,0 +1,16 @@
+from ...helper import packing
+
+MATRIX = [
+    [[(0, 0, 1), (10, 10, 0)], [(0, float('-inf'), 0), (2, 0, 1), (10, 8, 0)]],
+    [[(0, float('-inf'), 0), (10, float('-inf'), 0)], [(0, 0, 1), (10, 10, 0)]],
+]
+
+
+def test_pack_and_unpack():
+    offsets, break_points = packing.pack(MATRIX)
+
+    assert list(offsets) == [0, 2, 5, 7, 9]
+    assert break_points.shape == (9, 3)
+    assert list(packing.cell(offsets, break_points, 2, 0, 1)[1]) == [2, 0, 1]
+
+    assert packing.unpack(offsets, break_points, (2, 2)) == MATRIX
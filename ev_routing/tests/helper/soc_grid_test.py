@@ -0,0 +1,33 @@
+import numpy as np
+from ...helper import soc_grid
+from ...helper import break_points_list as bp_list
+
+
+def test_evaluate():
+    lst = [(0, float('-inf'), 0), (2, 0, 1), (3, 4, 1), (8, 9, 0), (10, 9, 0)]
+    xs = [0, 1, 2, 2.5, 3, 5, 8, 9.5, 10]
+
+    y = soc_grid.evaluate(lst, xs)
+
+    assert list(y) == [bp_list._f(lst, x) for x in xs]
+
+
+def test_link_and_merge():
+    M = 10
+    # Consuming 2 and 3 units of charge
+    y_ik = soc_grid.from_break_points([(0, float('-inf'), 0), (2, 0, 1), (10, 8, 0)], M, 11)
+    y_kj = soc_grid.from_break_points([(0, float('-inf'), 0), (3, 0, 1), (10, 7, 0)], M, 11)
+
+    y = soc_grid.link(y_ik, y_kj, M)
+
+    assert np.all(np.isneginf(y[:5]))
+    assert list(y[5:]) == [0, 1, 2, 3, 4, 5]
+
+    assert list(soc_grid.merge(y, y_ik)) == list(y_ik)
+
+
+def test_to_break_points():
+    M = 10
+    lst = [(0, float('-inf'), 0), (2, 0, 1), (10, 8, 0)]
+
+    assert soc_grid.to_break_points(soc_grid.from_break_points(lst, M, 11), M) == lst
@@ -0,0 +1,63 @@
+import numpy as np
+from scipy.sparse.csgraph import johnson
+from ..dijkstra import Dijkstra
+from ..dijkstra_profile import DijkstraProfile
+from ..helper import break_points_list
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+
+
+def test_lower_bounds():
+    d = Dijkstra(AREA, testing=True)
+    d.set_landmarks(3)
+
+    assert len(d.landmarks.landmarks) == 3
+
+    distances = johnson(d.adjacency())
+    adjacency = d.adjacency().tocoo()
+
+    for t, tid in enumerate(d.vid):
+        bounds = d.landmarks.lower_bounds(tid)
+
+        assert np.all(bounds <= distances[:, t])
+        # Consistency
+        assert np.all(bounds[adjacency.row] <= adjacency.data + bounds[adjacency.col])
+
+
+def test_dijkstra():
+    d = Dijkstra(AREA, testing=True)
+    d.set_landmarks(3)
+    M = 10
+
+    for bs in [0, 1, 2.5, 5, 9, M]:
+        for sid in d.v:
+            soc = {vid: float('-inf') for vid in d.v}
+            soc[sid] = bs
+
+            for _ in d.v:
+                for e in d.e.values():
+                    b = soc[e['u']] - e['cost']
+                    soc[e['v']] = max(soc[e['v']], float('-inf') if b < 0 else min(M, b))
+
+            for tid in d.v:
+                assert d.dijkstra(sid, tid, bs, M)[0]['b'] == soc[tid]
+
+
+def test_dijkstra_profile(monkeypatch):
+    M = 10
+    dp = DijkstraProfile(AREA, M, testing=True)
+    # Without pruning the profile search is exact
+    f = {sid: dp._search(sid) for sid in dp.v}
+
+    dp.set_landmarks(3)
+
+    for s in dp.v:
+        for t in dp.v:
+            assert break_points_list.dominates(f[s][t], dp.run(s, t))
+
+    # Only the potential and the landmark pruning left
+    monkeypatch.setattr(dp, '_target_prune', lambda f_vid, f_tid: False)
+
+    for s in dp.v:
+        for t in dp.v:
+            assert dp.run(s, t) == f[s][t]
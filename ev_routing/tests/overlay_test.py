@@ -0,0 +1,83 @@
+from ..overlay import MultiLevelOverlay
+from ..dijkstra_profile import DijkstraProfile
+from ..helper import break_points_list
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+
+
+def max_soc(evr, costs, sid, b, M):
+    """Label-correcting reference search on the original graph"""
+    soc = {vid: float('-inf') for vid in evr.v}
+    soc[sid] = b
+
+    for _ in evr.v:
+        for eid, e in evr.e.items():
+            b_v = soc[e['u']] - costs[eid]
+            soc[e['v']] = max(soc[e['v']], float('-inf') if b_v < 0 else min(M, b_v))
+
+    return soc
+
+
+def test_query():
+    M = 10
+
+    for levels in [1, 2, 3]:
+        overlay = MultiLevelOverlay(AREA, M, levels=levels, testing=True)
+        overlay.customize()
+
+        assert len({overlay.cell(1, vid) for vid in overlay.v}) == 2 ** levels
+
+        costs = {eid: e['cost'] for eid, e in overlay.e.items()}
+        for sid in overlay.v:
+            for b in [0, 2.5, M]:
+                soc = max_soc(overlay, costs, sid, b, M)
+
+                for tid in overlay.v:
+                    assert overlay.query(sid, tid, b) == soc[tid]
+
+
+def test_profile():
+    M = 10
+    overlay = MultiLevelOverlay(AREA, M, testing=True)
+    overlay.customize()
+    dp = DijkstraProfile(AREA, M, testing=True)
+
+    for sid in overlay.v:
+        f = dp._search(sid)
+
+        for tid in overlay.v:
+            for b in [0, 2.5, 5, 7.5, M]:
+                assert (break_points_list._f(overlay.profile(sid, tid), b)
+                        == break_points_list._f(f[tid], b))
+
+
+def test_customize():
+    M = 10
+    overlay = MultiLevelOverlay(AREA, M, testing=True)
+    costs = {eid: abs(e['cost']) + 1 for eid, e in overlay.e.items()}
+
+    overlay.customize(costs, workers=2)
+    cliques = overlay.cliques
+
+    overlay.customize(costs)
+    assert overlay.cliques == cliques
+
+    for sid in overlay.v:
+        soc = max_soc(overlay, costs, sid, M, M)
+
+        for tid in overlay.v:
+            assert overlay.query(sid, tid, M) == soc[tid]
+
+
+def test_update_edges():
+    M = 10
+    overlay = MultiLevelOverlay(AREA, M, testing=True)
+    overlay.customize()
+
+    cells = overlay.update_edges({12: float('inf'), 24: 2})
+    assert 0 < len(cells) < len(overlay.cliques)
+
+    expected = dict(overlay.cliques)
+    overlay.customize()
+
+    assert overlay.cliques == expected
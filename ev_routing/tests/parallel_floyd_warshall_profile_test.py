@@ -0,0 +1,15 @@
+from ..floyd_warshall_profile import FloydWarshallProfile
+from ..parallel_floyd_warshall_profile import ParallelFloydWarshallProfile
+
+AREA = [52.514e0, 13.385e0, 52.516e0, 13.387e0]
+M = 10
+
+
+def test_run():
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    fw.run()
+
+    pfw = ParallelFloydWarshallProfile(AREA, M, testing=True, workers=2, tile=3)
+    pfw.run()
+
+    assert pfw.matrix == fw.matrix
@@ -0,0 +1,27 @@
+import pytest
+from ..floyd_warshall_profile import FloydWarshallProfile
+from ..profile_oracle import ProfileOracle
+from ..helper import break_points_list
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+M = 10
+
+
+def test_query(tmp_path):
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    fw.run()
+    fw.export(str(tmp_path / 'store'))
+
+    oracle = ProfileOracle(str(tmp_path / 'store'))
+    n = len(fw.matrix)
+
+    assert oracle.n == n
+    assert oracle.index(fw.vid[3]) == 3
+
+    for s in range(n):
+        for t in range(n):
+            for b in [0, 0.5, 2, 5, 7.25, M]:
+                assert oracle.query(s, t, b) == break_points_list._f(fw.matrix[s][t], b)
+
+    with pytest.raises(ValueError):
+        oracle.query(0, 1, M + 1)
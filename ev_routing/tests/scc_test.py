@@ -0,0 +1,82 @@
+from ..map import MapAPI
+from ..map import scc
+from ..dijkstra import Dijkstra
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+
+
+def remove_edge(m, eid):
+    e = m.e.pop(eid)
+    m.v[e['u']]['outgoing'].remove(eid)
+    m.v[e['v']]['incoming'].remove(eid)
+
+
+def test_components():
+    m = MapAPI(AREA, testing=True)
+    assert len(set(scc.strongly_connected_components(m.v, m.e).values())) == 1
+
+    # 9 can not be reached anymore
+    remove_edge(m, 17)
+    component = scc.strongly_connected_components(m.v, m.e)
+
+    assert len(set(component.values())) == 2
+    assert component[9] > component[0]
+
+    # Long paths do not hit the recursion limit
+    n = 10000
+    v = {i: {'outgoing': [i]} for i in range(n)}
+    e = {i: {'u': i, 'v': i + 1} for i in range(n - 1)}
+    v[n - 1]['outgoing'] = []
+
+    assert len(set(scc.strongly_connected_components(v, e).values())) == n
+
+
+def test_prune_components():
+    m = MapAPI(AREA, testing=True)
+    remove_edge(m, 17)
+    m.prune_components('tag')
+
+    assert m.reachable(9, 0) and not m.reachable(0, 9) and m.reachable(0, 4)
+
+    m.prune_components('largest')
+
+    assert 9 not in m.v and len(m.v) == 9
+    assert all(e['u'] != 9 and e['v'] != 9 for e in m.e.values())
+    assert all(eid in m.e for u in m.v.values() for eid in u['outgoing'] + u['incoming'])
+
+
+def test_searches():
+    d = Dijkstra(AREA, testing=True, scc='largest')
+    assert len(d.vid) == 10
+
+    remove_edge(d.map, 17)
+    d.map.prune_components('tag')
+
+    soc, _, trace = d.dijkstra(0, 9, 10, 10)
+    assert soc['b'] == float('-inf') and trace == []
+
+
+def test_tags_after_update():
+    d = Dijkstra(AREA, testing=True, scc='tag')
+    assert d.map.reachable(0, 9)
+
+    # Closing the only edge into 9
+    d.update_edge(17, float('inf'))
+    assert not d.map.reachable(0, 9) and d.map.reachable(9, 0)
+
+    soc, _, trace = d.dijkstra(0, 9, 10, 10)
+    assert soc['b'] == float('-inf') and trace == []
+
+    d.update_edge(17, 1)
+    assert d.map.reachable(0, 9)
+
+
+def test_prune_in_place():
+    m = MapAPI(AREA, testing=True)
+    v, e = m.v, m.e
+
+    m.update_edge(17, float('inf'))
+    m.prune_components('largest')
+
+    assert m.v is v and m.e is e
+    assert 9 not in v and len(v) == 9
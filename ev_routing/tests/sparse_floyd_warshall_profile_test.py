@@ -0,0 +1,49 @@
+from ..floyd_warshall_profile import FloydWarshallProfile
+from ..sparse_floyd_warshall_profile import SparseFloydWarshallProfile
+from ..helper import break_points_list
+
+AREA = [52.514e0, 13.385e0, 52.516e0, 13.387e0]
+M = 5
+
+
+def test_run():
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    fw.run()
+
+    sfw = SparseFloydWarshallProfile(AREA, M, testing=True)
+
+    assert sfw.reachable_pairs() == 10 + 25
+
+    sfw.run()
+
+    assert [list(row) for row in sfw.matrix] == fw.matrix
+    assert sfw.reachable_pairs() == 71
+
+    # Unreachable cells share one list
+    assert sfw.matrix[2][9] is sfw.matrix[3][5] is sfw.unreachable
+
+
+def test_repair():
+    sfw = SparseFloydWarshallProfile(AREA, M, testing=True)
+    sfw.run()
+    costs = {eid: sfw.e[eid]['cost'] for eid in [0, 17]}
+
+    sfw.update_edges({0: float('inf'), 17: float('inf')})
+
+    fw = FloydWarshallProfile(AREA, M, testing=True)
+    for eid in costs:
+        fw.e[eid]['cost'] = float('inf')
+    fw.matrix = [
+        [fw._initial_cell(i, j) for j in range(len(fw.matrix))]
+        for i in range(len(fw.matrix))
+    ]
+    fw.run()
+
+    assert [list(row) for row in sfw.matrix] == fw.matrix
+    # Cells which are no longer reachable are dropped
+    assert sfw.reachable_pairs() == sum(
+        break_points_list.reachable(l) for row in fw.matrix for l in row) < 71
+
+    sfw.update_edges(costs)
+
+    assert sfw.reachable_pairs() == 71
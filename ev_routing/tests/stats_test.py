@@ -0,0 +1,80 @@
+from ev_routing.dijkstra import Dijkstra
+from ev_routing.dijkstra_profile import DijkstraProfile
+from ev_routing.floyd_warshall_profile import FloydWarshallProfile
+from ev_routing.contraction_hierarchy import ContractionHierarchy
+from ev_routing.overlay import MultiLevelOverlay
+from ev_routing.helper.stats import Stats
+
+
+def test_dijkstra_stats():
+    d = Dijkstra(None, testing=True)
+
+    result = d.dijkstra(0, 5, 5, 10)
+    counted, stats = d.dijkstra(0, 5, 5, 10, stats=True)
+
+    assert counted == result
+    assert isinstance(stats, Stats)
+    assert stats.pops > 0
+    assert stats.pushes >= stats.pops
+    assert stats.relaxations > 0
+    assert 'total' in stats.times
+
+
+def test_dijkstra_profile_stats(capsys):
+    dp = DijkstraProfile(None, 10, testing=True)
+
+    l = dp.run(0, 5)
+    l_counted, stats = dp.run(0, 5, stats=True)
+
+    assert l_counted == l
+    assert stats.links > 0 and stats.links == stats.merges
+    assert stats.pops <= stats.pushes
+    assert stats.break_points[5] == len(l)
+    assert stats.reached == len(stats.break_points)
+    assert {'total', 'feasibility', 'potential', 'link', 'sort', 'merge'} <= set(stats.times)
+    assert sum(t for name, t in stats.times.items() if name != 'total') <= stats.times['total']
+
+    # No progress is printed from the search
+    assert capsys.readouterr().out == ''
+
+
+def test_stats_as_dict():
+    dp = DijkstraProfile(None, 10, testing=True)
+    _, stats = dp.run_one_to_all(0, stats=True)
+
+    d = stats.as_dict()
+    assert d['links'] == stats.links
+    assert d['break_points'] == stats.break_points
+    assert 'links=' in repr(stats)
+
+
+def test_floyd_warshall_stats():
+    fw = FloydWarshallProfile(None, 10, testing=True)
+    result, stats = fw.run(stats=True)
+
+    assert result is None
+    assert stats.links == stats.merges == 10 ** 3
+    assert stats.reached == len(stats.break_points) <= 100
+    assert stats.break_points[(0, 0)] == len(fw.matrix[0][0])
+
+
+def test_hierarchy_and_overlay_stats():
+    ch = ContractionHierarchy(None, 10, testing=True)
+    ch.preprocess()
+
+    b, stats = ch.query(0, 5, 10, stats=True)
+    assert b == ch.query(0, 5, 10)
+    assert stats.pops > 0 and stats.relaxations > 0
+    assert {'closure', 'upward', 'downward'} <= set(stats.times)
+
+    l, stats = ch.profile(0, 5, stats=True)
+    assert l == ch.profile(0, 5)
+    assert stats.links == stats.merges > 0
+
+    overlay = MultiLevelOverlay(None, 10, testing=True)
+    overlay.customize()
+
+    l, stats = overlay.profile(0, 5, stats=True)
+    assert l == overlay.profile(0, 5)
+    assert stats.pops > 0 and stats.links > 0
+    assert 'neighbours' in stats.times
@@ -0,0 +1,29 @@
+from ..subset_profile import SubsetProfile
+from ..profile_oracle import ProfileOracle
+from ..helper import break_points_list
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+M = 10
+
+
+def test_run():
+    sp = SubsetProfile(AREA, M, list(range(10)), testing=True)
+    sp.run()
+
+    subset = SubsetProfile(AREA, M, [3, 0, 5], testing=True)
+    subset.run()
+
+    for i, s in enumerate(subset.nodes):
+        for j, t in enumerate(subset.nodes):
+            assert subset.matrix[i][j] == sp.matrix[s][t]
+
+
+def test_export(tmp_path):
+    sp = SubsetProfile(AREA, M, [3, 0, 5], testing=True)
+    sp.run()
+    sp.export(str(tmp_path / 'store'))
+
+    oracle = ProfileOracle(str(tmp_path / 'store'))
+    i, j = oracle.index(0), oracle.index(5)
+
+    assert oracle.query(i, j, M) == break_points_list._f(sp.matrix[1][2], M)
@@ -0,0 +1,71 @@
+import numpy as np
+from ..map import MapAPI
+from ..map import synthetic
+from ..map.scc import strongly_connected_components
+from ..dijkstra import Dijkstra
+from ..floyd_warshall_profile import FloydWarshallProfile
+
+
+def check_graph(v, e):
+    for eid, edge in e.items():
+        assert eid in v[edge['u']]['outgoing'] and eid in v[edge['v']]['incoming']
+
+    # Both directions of a segment
+    for eid in range(0, len(e), 2):
+        assert (e[eid]['u'], e[eid]['v']) == (e[eid + 1]['v'], e[eid + 1]['u'])
+
+
+def test_grid():
+    v, e = synthetic.grid(10, 20)
+
+    assert len(v) == 200
+    assert len(e) == 2 * (10 * 19 + 9 * 20)
+    check_graph(v, e)
+
+    # Same graph for the same seed
+    assert synthetic.grid(10, 20)[1] == e
+    assert synthetic.grid(10, 20, seed=1)[1] != e
+
+    assert len(synthetic.grid(10, 20, missing=0.5)[1]) < len(e)
+
+
+def test_costs():
+    v, e = synthetic.random_geometric(500)
+    check_graph(v, e)
+
+    costs = np.array([edge['cost'] for edge in e.values()])
+    assert np.any(costs < 0) and np.any(costs > 0)
+
+    # Costs of MapAPI._cost
+    m = MapAPI(graph=(v, e))
+    for edge in list(e.values())[:50]:
+        p1, p2 = [(m.v[edge[x]]['lat'], m.v[edge[x]]['lon'], m.v[edge[x]]['elev']) for x in 'uv']
+        assert np.isclose(m._cost(p1, p2), edge['cost'])
+
+    # Cycles do not gain charge
+    assert all(e[eid]['cost'] + e[eid + 1]['cost'] >= 0 for eid in range(0, len(e), 2))
+
+
+def test_hierarchical():
+    v, e = synthetic.hierarchical(towns=5, town_size=50, road_spacing=200)
+    check_graph(v, e)
+
+    assert len(v) > 250
+    assert min(len(u['outgoing']) for u in list(v.values())[250:]) == 2
+
+    component = strongly_connected_components(v, e)
+    assert max(np.bincount(list(component.values()))) > 200
+
+
+def test_routing():
+    graph = synthetic.grid(8, 8)
+
+    d = Dijkstra(None, graph=graph)
+    assert d.vid == list(range(64))
+
+    nodes, soc, _ = d.isochrone(0, 20, M=20)
+    assert 0 < len(nodes) <= 64
+
+    fw = FloydWarshallProfile(None, 20, graph=synthetic.grid(4, 4))
+    fw.run()
+    assert len(fw.matrix) == 16
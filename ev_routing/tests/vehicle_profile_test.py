@@ -0,0 +1,95 @@
+import numpy as np
+from ..map import MapAPI, VehicleProfile
+from ..map import synthetic
+from ..dijkstra import Dijkstra
+from ..floyd_warshall_profile import FloydWarshallProfile
+from ..overlay import MultiLevelOverlay
+
+AREA = [52.51, 13.373, 52.52, 13.401]
+
+
+def test_costs():
+    m = MapAPI(AREA, testing=True)
+    car, truck = VehicleProfile(), VehicleProfile(kappa=0.05, lmbda=2, mu=0.1)
+
+    arrays = m.edge_arrays()
+    assert arrays['id'].tolist() == list(m.e)
+
+    expected = [
+        m._cost(*[(m.v[e[x]]['lat'], m.v[e[x]]['lon'], m.v[e[x]]['elev']) for x in 'uv'])
+        for e in m.e.values()
+    ]
+    assert np.allclose(m.costs(car), expected)
+    assert np.allclose(m.costs(truck), 2.5 * m.costs(car))
+
+    # Cached per profile
+    assert m.costs(VehicleProfile()) is m.costs(car)
+
+
+def test_elevation():
+    profile = VehicleProfile(kappa=0.5, lmbda=2, mu=0.25)
+    costs = profile.costs(np.array([10, 10, 10]), np.array([-4, 0, 4]))
+
+    assert costs.tolist() == [4, 5, 13]
+
+
+def test_overlay_customize():
+    overlay = MultiLevelOverlay(AREA, 500, testing=True)
+    profile = VehicleProfile(kappa=0.01)
+
+    overlay.customize(profile)
+    cliques = overlay.cliques
+
+    costs = overlay.map.costs(profile)
+    overlay.customize(dict(zip(overlay.map.edge_arrays()['id'].tolist(), costs.tolist())))
+
+    assert overlay.cliques == cliques
+
+
+def test_costs_with_elevations():
+    m = MapAPI(None, graph=synthetic.grid(4, 4, relief=40))
+    truck = VehicleProfile(kappa=0.05, lmbda=2, mu=0.1)
+
+    expected = [
+        m._cost(*[(m.v[e[x]]['lat'], m.v[e[x]]['lon'], m.v[e[x]]['elev']) for x in 'uv'],
+                kappa=0.05, lmbda=2, mu=0.1)
+        for e in m.e.values()
+    ]
+    assert np.allclose(m.costs(truck), expected)
+
+    # Slopes are weighted differently uphill and downhill
+    assert np.any(m.edge_arrays()['dh'] < 0) and np.any(m.edge_arrays()['dh'] > 0)
+    assert not np.allclose(m.costs(truck), 2.5 * m.costs(VehicleProfile()))
+
+
+def test_engines_with_profile():
+    truck = VehicleProfile(kappa=0.05, lmbda=2, mu=0.1)
+    M = 30
+
+    d = Dijkstra(None, graph=synthetic.grid(4, 4, relief=40), profile=truck)
+    expected = Dijkstra(None, graph=synthetic.grid(4, 4, relief=40, profile=truck))
+
+    car = Dijkstra(None, graph=synthetic.grid(4, 4, relief=40))
+
+    assert d.map.profile is truck
+    for t in [5, 10, 15]:
+        assert d.dijkstra(0, t, 100, 100) == expected.dijkstra(0, t, 100, 100)
+        assert 0 < d.dijkstra(0, t, 100, 100)[0]['b'] < car.dijkstra(0, t, 100, 100)[0]['b']
+
+    # Switching the vehicle of a computed matrix
+    fw = FloydWarshallProfile(None, M, graph=synthetic.grid(3, 3, relief=40))
+    fw.run()
+    fw.set_profile(truck)
+
+    expected = FloydWarshallProfile(None, M, graph=synthetic.grid(3, 3, relief=40, profile=truck))
+    expected.run()
+
+    assert [e['cost'] for e in fw.e.values()] == [e['cost'] for e in expected.e.values()]
+    assert fw.matrix == expected.matrix
+
+    # Back to the loaded costs, closures are kept
+    fw.update_edge(0, float('inf'))
+    fw.set_profile(None)
+
+    assert fw.e[0]['cost'] == float('inf')
+    assert fw.map.changed_edges[0] == synthetic.grid(3, 3, relief=40)[1][0]['cost']